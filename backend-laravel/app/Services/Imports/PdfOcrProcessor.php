@@ -9,6 +9,16 @@
 
 class PdfOcrProcessor implements ProcessorInterface
 {
+    /**
+     * Tempo máximo do extrator Python, em segundos
+     */
+    private const PYTHON_TIMEOUT = 30;
+
+    /**
+     * Prazo informado ao extrator, com folga para ele devolver o resultado parcial
+     */
+    private const PYTHON_DEADLINE = 25;
+
     /**
      * Processa arquivo PDF escaneado usando Python OCR
      */
@@ -62,6 +72,17 @@ public function process(FileImport $fileImport): void
      */
     private function extractWithPython(string $filePath): array
     {
+        // Usa o servidor persistente quando configurado, evitando subir o Python a cada arquivo
+        $socketPath = config('services.pdf_extractor.socket');
+        
+        if ($socketPath && file_exists($socketPath)) {
+            $data = $this->extractWithServer($socketPath, $filePath);
+            
+            if ($data !== null) {
+                return $data;
+            }
+        }
+        
         $scriptPath = base_path('scripts/minimal_extractor.py');
         $venvPath = base_path('venv/bin/python3');
         
@@ -73,9 +94,18 @@ private function extractWithPython(string $filePath): array
             throw new \Exception('Ambiente virtual Python não encontrado: ' . $venvPath);
         }
         
+        // O script para de iniciar páginas antes do timeout e devolve o que já extraiu
+        $envPrefix = 'PDF_DEADLINE_SECONDS=' . self::PYTHON_DEADLINE . ' ';
+        
+        // Com o trace ativo, cada etapa concluída fica registrada mesmo se o timeout matar o script
+        $tracePath = config('services.pdf_extractor.trace');
+        $envPrefix .= $tracePath ? 'PDF_METRICS_TRACE=' . escapeshellarg($tracePath) . ' ' : '';
+        
         // Executa o script Python com timeout
         $command = sprintf(
-            'timeout 30 %s %s "%s" 2>&1',
+            '%stimeout %d %s %s "%s" 2>&1',
+            $envPrefix,
+            self::PYTHON_TIMEOUT,
             $venvPath,
             $scriptPath,
             $filePath
@@ -84,7 +114,8 @@ private function extractWithPython(string $filePath): array
         $output = shell_exec($command);
         
         if (empty($output)) {
-            throw new \Exception('Script Python não retornou dados ou travou');
+            $hint = $tracePath ? ' (etapas registradas em ' . $tracePath . ')' : '';
+            throw new \Exception('Script Python não retornou dados ou travou' . $hint);
         }
         
         $data = json_decode($output, true);
@@ -96,6 +127,69 @@ private function extractWithPython(string $filePath): array
         return $data;
     }
 
+    /**
+     * Extrai dados pelo servidor Python persistente (scripts/extractor_server.py)
+     */
+    private function extractWithServer(string $socketPath, string $filePath): ?array
+    {
+        $socket = @stream_socket_client('unix://' . $socketPath, $errno, $errstr, 2);
+        
+        if ($socket === false) {
+            \Log::warning('Servidor de extração Python indisponível, usando script', [
+                'socket' => $socketPath,
+                'error' => $errstr,
+            ]);
+            return null;
+        }
+        
+        stream_set_timeout($socket, self::PYTHON_TIMEOUT);
+        
+        fwrite($socket, json_encode([
+            'id' => uniqid('', true),
+            'path' => $filePath,
+            'extractor' => 'minimal',
+            'deadline' => self::PYTHON_DEADLINE,
+        ]) . "\n");
+        
+        $output = fgets($socket);
+        $timedOut = stream_get_meta_data($socket)['timed_out'];
+        fclose($socket);
+        
+        // Servidor ocupado além do timeout conta como indisponível: o script ainda pode atender
+        if ($output === false && $timedOut) {
+            \Log::warning('Servidor de extração Python não respondeu a tempo, usando script', [
+                'socket' => $socketPath,
+                'timeout' => self::PYTHON_TIMEOUT,
+            ]);
+            return null;
+        }
+        
+        if (empty($output)) {
+            throw new \Exception('Servidor Python não retornou dados ou travou');
+        }
+        
+        $response = json_decode($output, true);
+        
+        if (json_last_error() !== JSON_ERROR_NONE) {
+            throw new \Exception('Erro ao decodificar JSON do servidor Python: ' . json_last_error_msg() . ' - Output: ' . $output);
+        }
+        
+        // O prazo do pedido acabou na fila do servidor, antes de a extração começar
+        if (!empty($response['busy'])) {
+            \Log::warning('Servidor de extração Python ocupado, usando script', [
+                'socket' => $socketPath,
+                'error' => $response['error'] ?? null,
+            ]);
+            return null;
+        }
+        
+        if (isset($response['error'])) {
+            throw new \Exception($response['error']);
+        }
+        
+        return $response['result'] ?? [];
+    }
+
     /**
      * Executa OCR na imagem usando Tesseract
      */
@@ -158,6 +252,10 @@ private function processContratoPdf(array $data, FileImport $fileImport): void
                 'metodo' => $data['metodo'] ?? 'Python',
                 'previsao_legal' => $data['previsao_legal'] ?? null,
                 'data_final_documento' => $data['data_final_documento'] ?? null,
+                'parcial' => $data['partial'] ?? false,
+                'paginas_processadas' => $data['pages_covered'] ?? null,
+                'total_paginas' => $data['page_count'] ?? null,
+                'paginas_em_branco' => $data['blank_pages'] ?? null,
             ],
         ]);
     }
@@ -31,4 +31,12 @@
         'region' => env('AWS_DEFAULT_REGION', 'us-east-1'),
     ],
 
+    'pdf_extractor' => [
+        // Socket do servidor persistente (scripts/extractor_server.py --socket ...)
+        'socket' => env('PDF_EXTRACTOR_SOCKET'),
+
+        // Arquivo de trace com o tempo de cada etapa da extração (JSON lines)
+        'trace' => env('PDF_EXTRACTOR_TRACE'),
+    ],
+
 ];
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Extração em lote de contratos PDF
+
+Processa um diretório, um glob ou um manifesto (um caminho por linha) com
+concorrência limitada, emitindo uma linha JSON por documento assim que
+ele termina. Erros de um arquivo não interrompem o lote. Se um processo
+morre (ex.: falta de memória), os documentos que estavam no pool são
+repetidos um de cada vez em um pool novo, e só o que quebrar o pool de
+novo sozinho é informado como erro.
+
+Uso:
+    python batch_extractor.py storage/app/imports
+    python batch_extractor.py "contratos/**/*.pdf" --workers 4
+    python batch_extractor.py --manifest lista.txt --extractor pdf
+"""
+
+import sys
+import json
+import os
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from extractor_server import EXTRACTORS, DEFAULT_EXTRACTOR, run_extraction
+
+
+def iter_input_files(inputs, manifest=None):
+    """Lista os arquivos a processar a partir de diretórios, globs e manifesto"""
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                for name in sorted(files):
+                    if name.lower().endswith('.pdf'):
+                        yield os.path.join(root, name)
+        elif glob.has_magic(item):
+            yield from sorted(glob.glob(item, recursive=True))
+        else:
+            yield item
+
+    if manifest:
+        with open(manifest, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+
+
+def process_file(pdf_path, extractor):
+    """Extrai um arquivo, medindo o tempo gasto no processo de trabalho"""
+    started = time.perf_counter()
+    result = run_extraction(pdf_path, extractor)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    return result, elapsed_ms
+
+
+def make_record(pdf_path, result=None, elapsed_ms=None, error=None):
+    """Monta a linha de saída de um documento"""
+    if error is None and isinstance(result, dict) and 'error' in result:
+        error = result['error']
+        result = None
+
+    record = {'file': pdf_path, 'ok': error is None, 'elapsed_ms': elapsed_ms}
+    if error is None:
+        record['result'] = result
+    else:
+        record['error'] = error
+    return record
+
+
+def run_batch(files, extractor=DEFAULT_EXTRACTOR, workers=None, output=sys.stdout):
+    """Processa os arquivos com no máximo `workers` documentos em andamento"""
+    workers = workers or os.cpu_count() or 1
+    summary = {'total': 0, 'ok': 0, 'errors': 0}
+    started = time.perf_counter()
+
+    def emit(record):
+        summary['total'] += 1
+        summary['ok' if record['ok'] else 'errors'] += 1
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+
+    files = iter(files)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = {}
+    # Documentos que estavam no pool quando ele quebrou, ainda sem saber qual foi o culpado
+    suspects = []
+    isolated = set()
+
+    def rebuild():
+        """Troca o pool quebrado; os documentos pendentes nele viram suspeitos"""
+        nonlocal pool
+        suspects.extend(pending.values())
+        pending.clear()
+        pool.shutdown(wait=False, cancel_futures=True)
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+    def submit(pdf_path):
+        """Envia o arquivo ao pool; se o pool já estiver quebrado, o arquivo vira suspeito e o pool é trocado"""
+        try:
+            pending[pool.submit(process_file, pdf_path, extractor)] = pdf_path
+            return True
+        except BrokenProcessPool:
+            isolated.discard(pdf_path)
+            suspects.insert(0, pdf_path)
+            rebuild()
+            return False
+
+    try:
+        while True:
+            if suspects or isolated:
+                # Um suspeito por vez: o que quebrar o pool sozinho é o culpado
+                if not pending:
+                    pdf_path = suspects.pop(0)
+                    isolated.add(pdf_path)
+                    if not submit(pdf_path):
+                        continue
+            else:
+                # Mantém a fila limitada para não carregar milhares de futures de uma vez
+                while len(pending) < workers * 2:
+                    pdf_path = next(files, None)
+                    if pdf_path is None or not submit(pdf_path):
+                        break
+                if suspects:
+                    # O pool quebrou durante o envio
+                    continue
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                pdf_path = pending.pop(future)
+                try:
+                    result, elapsed_ms = future.result()
+                    emit(make_record(pdf_path, result, elapsed_ms))
+                except BrokenProcessPool:
+                    broken = True
+                    if pdf_path in isolated:
+                        emit(make_record(pdf_path, error='Processo de extração encerrado inesperadamente'))
+                    else:
+                        suspects.append(pdf_path)
+                except Exception as e:
+                    emit(make_record(pdf_path, error=str(e)))
+                isolated.discard(pdf_path)
+
+            if broken:
+                # Um processo morto invalida o pool; os pendentes ainda não vistos também são suspeitos
+                rebuild()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    summary['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return summary
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Extração em lote de contratos PDF')
+    parser.add_argument('inputs', nargs='*', help='Diretórios, arquivos ou globs')
+    parser.add_argument('--manifest', help='Arquivo com um caminho de PDF por linha')
+    parser.add_argument('--extractor', default=DEFAULT_EXTRACTOR, choices=sorted(EXTRACTORS))
+    parser.add_argument('--workers', type=int, default=None, help='Documentos processados em paralelo (padrão: núcleos da CPU)')
+    args = parser.parse_args()
+
+    if not args.inputs and not args.manifest:
+        print(json.dumps({"error": "Uso: python batch_extractor.py <diretório|glob|arquivo>... [--manifest lista.txt]"}))
+        sys.exit(1)
+
+    summary = run_batch(
+        iter_input_files(args.inputs, args.manifest),
+        extractor=args.extractor,
+        workers=args.workers,
+    )
+
+    # O resumo vai para stderr para manter stdout com uma linha por documento
+    print(json.dumps({'summary': summary}), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos extratores sobre o corpus sintético
+
+Cada extração roda em um processo novo (sem cache e com OCR serial), que
+devolve o tempo por etapa (abertura, camada de texto, renderização, OCR,
+campos, JSON), o pico de memória dele e dos subprocessos do tesseract e o
+resultado. O relatório compara os campos extraídos com os valores
+esperados do corpus e agrega tudo por extrator e por tipo de documento.
+
+Com --preprocess, cada extrator roda com e sem o pré-processamento das
+imagens (PDF_OCR_PREPROCESS) e o relatório traz lado a lado o tempo de OCR
+e a taxa de acerto dos campos por tipo de documento.
+
+Uso:
+    python benchmark.py --corpus /tmp/corpus --generate
+    python benchmark.py --corpus /tmp/corpus --extractors pdf,minimal --repeat 3 --output relatorio.json
+    python benchmark.py --corpus /tmp/corpus --extractors minimal --preprocess
+"""
+
+import sys
+import json
+import os
+import time
+import argparse
+import subprocess
+from statistics import mean
+
+from extractor_server import EXTRACTORS, run_extraction
+from contract_extractor.stage_timer import collect, peak_memory, stage
+from synthetic_corpus import TRUTH_FIELDS, generate_corpus, load_ground_truth
+
+
+# Ambiente dos processos medidos: sem cache, OCR no próprio processo e sem o coletor de métricas dos extratores
+BENCH_ENV = {'PDF_EXTRACTION_CACHE': '0', 'PDF_OCR_WORKERS': '1', 'PDF_METRICS': '0', 'PDF_METRICS_TRACE': ''}
+
+# Sufixo das variantes medidas com o pré-processamento das imagens
+PREPROCESS_SUFFIX = '+preprocess'
+
+# Limite por extração, acima do timeout usado pelo PdfOcrProcessor
+RUN_TIMEOUT = 300
+
+# Tolerância na comparação de valores monetários
+VALOR_TOLERANCE = 0.005
+
+
+def run_one(extractor, pdf_path):
+    """Executa uma extração no processo atual e retorna as medições"""
+    started = time.perf_counter()
+    with collect() as stages:
+        result = run_extraction(pdf_path, extractor)
+        with stage('json'):
+            json.dumps(result, ensure_ascii=False)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    measurements = {
+        'result': result,
+        'stages': stages.as_dict(),
+        'elapsed_ms': elapsed_ms,
+    }
+    measurements.update(peak_memory())
+    return measurements
+
+
+def measure(extractor, pdf_path, extra_env=None):
+    """Executa uma extração em um processo novo, para o pico de memória ser só dela"""
+    env = dict(os.environ, **BENCH_ENV)
+    env.update(extra_env or {})
+    command = [sys.executable, os.path.abspath(__file__), '--run-one', extractor, pdf_path]
+    try:
+        proc = subprocess.run(command, capture_output=True, text=True, env=env, timeout=RUN_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return {'error': f"Tempo limite de {RUN_TIMEOUT}s excedido"}
+
+    try:
+        return json.loads(proc.stdout)
+    except ValueError:
+        return {'error': (proc.stderr or proc.stdout).strip()[-500:] or f"Código de saída {proc.returncode}"}
+
+
+def score_fields(result, truth):
+    """Compara os campos extraídos com os esperados: {campo: acertou}"""
+    scores = {}
+    for field in TRUTH_FIELDS:
+        expected = truth.get(field)
+        found = result.get(field) if isinstance(result, dict) else None
+        if field == 'valor' and isinstance(found, (int, float)) and expected is not None:
+            scores[field] = abs(found - expected) < VALOR_TOLERANCE
+        else:
+            scores[field] = found == expected
+    return scores
+
+
+def summarize(runs):
+    """Agrega as execuções de um grupo (extrator ou extrator + tipo)"""
+    ok_runs = [run for run in runs if 'error' not in run]
+    summary = {'runs': len(runs), 'errors': len(runs) - len(ok_runs)}
+    if not ok_runs:
+        return summary
+
+    elapsed = [run['elapsed_ms'] for run in ok_runs]
+    summary['elapsed_ms'] = {'mean': round(mean(elapsed), 1), 'max': max(elapsed)}
+
+    # Média por documento de cada etapa (etapas ausentes contam como zero)
+    stage_names = sorted({name for run in ok_runs for name in run['stages']})
+    summary['stages'] = {
+        name: {
+            metric: round(mean(run['stages'].get(name, {}).get(metric, 0.0) for run in ok_runs), 1)
+            for metric in ('wall_ms', 'cpu_ms')
+        }
+        for name in stage_names
+    }
+
+    # Cada execução roda em um processo novo, então o pico do processo é o do documento
+    summary['peak_rss_kb'] = max(run['process_peak_rss_kb'] for run in ok_runs)
+    summary['peak_child_rss_kb'] = max(run['process_peak_child_rss_kb'] for run in ok_runs)
+
+    # Erros de extração contam como campos errados
+    accuracy = {field: round(mean(run['scores'][field] for run in runs), 3) for field in TRUTH_FIELDS}
+    accuracy['overall'] = round(mean(accuracy[field] for field in TRUTH_FIELDS), 3)
+    summary['accuracy'] = accuracy
+    return summary
+
+
+def benchmark_variants(extractors, preprocess=False):
+    """(rótulo, extrator, ambiente) de cada configuração medida"""
+    if not preprocess:
+        return [(extractor, extractor, {}) for extractor in extractors]
+
+    variants = []
+    for extractor in extractors:
+        variants.append((extractor, extractor, {'PDF_OCR_PREPROCESS': '0'}))
+        variants.append((extractor + PREPROCESS_SUFFIX, extractor, {'PDF_OCR_PREPROCESS': '1'}))
+    return variants
+
+
+def _ocr_ms(summary):
+    """Tempo médio de OCR por documento (com o pré-processamento, quando houver)"""
+    stages = summary.get('stages', {})
+    return round(sum(stages.get(name, {}).get('wall_ms', 0.0) for name in ('preprocess', 'ocr')), 1)
+
+
+def compare_preprocess(summaries, extractors):
+    """Tempo de OCR e acerto de cada extrator sem e com o pré-processamento, por tipo de documento"""
+    comparison = {}
+    for extractor in extractors:
+        without = summaries.get(extractor, {})
+        with_preprocess = summaries.get(extractor + PREPROCESS_SUFFIX, {})
+        comparison[extractor] = {}
+        for kind in sorted(set(without.get('by_kind', {})) | set(with_preprocess.get('by_kind', {}))):
+            before = without.get('by_kind', {}).get(kind, {})
+            after = with_preprocess.get('by_kind', {}).get(kind, {})
+            comparison[extractor][kind] = {
+                'ocr_ms': {'off': _ocr_ms(before), 'on': _ocr_ms(after)},
+                'preprocess_ms': after.get('stages', {}).get('preprocess', {}).get('wall_ms', 0.0),
+                'accuracy': {
+                    'off': before.get('accuracy', {}).get('overall'),
+                    'on': after.get('accuracy', {}).get('overall'),
+                },
+            }
+    return comparison
+
+
+def run_benchmark(corpus_dir, extractors, repeat=1, progress=None, preprocess=False):
+    """Executa os extratores sobre o corpus e monta o relatório"""
+    ground_truth = load_ground_truth(corpus_dir)
+    variants = benchmark_variants(extractors, preprocess)
+    runs = []
+
+    for label, extractor, extra_env in variants:
+        for name, entry in sorted(ground_truth.items()):
+            for _ in range(repeat):
+                run = measure(extractor, os.path.join(corpus_dir, name), extra_env)
+                result = run.get('result')
+                if isinstance(result, dict) and 'error' in result:
+                    run['error'] = result['error']
+                run.update({
+                    'extractor': label,
+                    'file': name,
+                    'kind': entry['kind'],
+                    'pages': entry['pages'],
+                    'scores': score_fields(result if 'error' not in run else None, entry['truth']),
+                })
+                runs.append(run)
+                if progress:
+                    progress(run)
+
+    report = {'corpus': corpus_dir, 'repeat': repeat, 'extractors': {}}
+    for label, _, _ in variants:
+        extractor_runs = [run for run in runs if run['extractor'] == label]
+        summary = summarize(extractor_runs)
+        summary['by_kind'] = {
+            kind: summarize([run for run in extractor_runs if run['kind'] == kind])
+            for kind in sorted({run['kind'] for run in extractor_runs})
+        }
+        report['extractors'][label] = summary
+
+    if preprocess:
+        report['preprocess'] = compare_preprocess(report['extractors'], extractors)
+
+    # O texto extraído não entra no relatório, só as medições
+    report['runs'] = [
+        {key: value for key, value in run.items() if key != 'result'}
+        for run in runs
+    ]
+    return report
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Benchmark dos extratores de contratos PDF')
+    parser.add_argument('--corpus', help='Diretório do corpus sintético')
+    parser.add_argument('--generate', action='store_true', help='Gera o corpus antes de medir')
+    parser.add_argument('--extractors', default=','.join(sorted(EXTRACTORS)), help='Extratores separados por vírgula')
+    parser.add_argument('--repeat', type=int, default=1, help='Execuções de cada arquivo por extrator')
+    parser.add_argument('--preprocess', action='store_true', help='Compara cada extrator com e sem o pré-processamento das imagens')
+    parser.add_argument('--output', help='Arquivo para o relatório JSON (padrão: stdout)')
+    parser.add_argument('--run-one', nargs=2, metavar=('EXTRATOR', 'PDF'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        # Processo filho: uma extração, medições em JSON no stdout
+        print(json.dumps(run_one(*args.run_one), ensure_ascii=False))
+        return
+
+    if not args.corpus:
+        print(json.dumps({"error": "Uso: python benchmark.py --corpus <diretório> [--generate]"}))
+        sys.exit(1)
+
+    extractors = [name for name in args.extractors.split(',') if name]
+    unknown = [name for name in extractors if name not in EXTRACTORS]
+    if unknown:
+        print(json.dumps({"error": f"Extrator desconhecido: {', '.join(unknown)}"}))
+        sys.exit(1)
+
+    if args.generate:
+        generate_corpus(args.corpus)
+
+    def progress(run):
+        status = 'erro' if 'error' in run else f"{run['elapsed_ms']} ms"
+        print(f"{run['extractor']:19} {run['file']:38} {status}", file=sys.stderr)
+
+    report = run_benchmark(args.corpus, extractors, args.repeat, progress, args.preprocess)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
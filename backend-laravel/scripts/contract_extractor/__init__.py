@@ -0,0 +1,39 @@
+"""
+Extração de dados de contratos PDF da CODEMAR
+
+Pipeline único (camada de texto, OCR das páginas escaneadas, campos) com
+estratégias trocáveis reunidas em presets: orçamento de páginas, resolução
+do OCR e conjunto de campos. Os scripts pdf_extractor.py,
+simple_extractor.py e minimal_extractor.py são os presets 'pdf', 'simple'
+e 'minimal'.
+
+O PDF é aberto uma única vez por extração (DocumentSession), a partir do
+caminho, de bytes ou de um stream. `triage_document` classifica o documento e
+estima o custo de OCR antes da extração.
+
+Uso:
+    from contract_extractor import extract_contract_data
+    data = extract_contract_data('/caminho/contrato.pdf', 'minimal')
+"""
+
+from .document import DocumentSession, document_session
+from .extractor import EARLY_EXIT, MAX_PAGES, extract_contract_data, get_page_count, stream_contract_data
+from .fields import BasicFieldSet, FieldSet
+from .presets import PRESETS, Preset, get_preset
+from .triage import triage_document
+
+__all__ = [
+    'EARLY_EXIT',
+    'MAX_PAGES',
+    'PRESETS',
+    'BasicFieldSet',
+    'DocumentSession',
+    'FieldSet',
+    'Preset',
+    'extract_contract_data',
+    'get_page_count',
+    'document_session',
+    'get_preset',
+    'stream_contract_data',
+    'triage_document',
+]
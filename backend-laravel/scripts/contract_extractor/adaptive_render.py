@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Renderização adaptativa para OCR
+
+Em vez de um zoom fixo, escolhe a resolução a partir do tamanho da página
+e da resolução da digitalização embutida, faz uma primeira passada barata
+em baixa resolução e só renderiza de novo em alta resolução quando a
+confiança média do Tesseract na página fica abaixo do limite.
+"""
+
+import os
+
+from .ocr_engine import ocr_pixmap_with_confidence, render_gray
+
+
+# Ativa o modo adaptativo nos extratores
+ADAPTIVE_ENABLED = os.environ.get('PDF_OCR_ADAPTIVE', '0') == '1'
+
+# Resoluções da primeira passada e da nova tentativa
+LOW_DPI = int(os.environ.get('PDF_OCR_LOW_DPI', '100'))
+HIGH_DPI = int(os.environ.get('PDF_OCR_HIGH_DPI', '200'))
+
+# Confiança média (0-100) abaixo da qual a página é renderizada de novo
+MIN_CONFIDENCE = float(os.environ.get('PDF_OCR_MIN_CONFIDENCE', '70'))
+
+# Limite de pixels por renderização, para páginas A3 ou maiores não travarem
+MAX_PIXELS = int(os.environ.get('PDF_OCR_MAX_PIXELS', str(12 * 1000 * 1000)))
+
+# Configuração que entra na chave do cache de páginas
+ADAPTIVE_SETTINGS = {
+    'low_dpi': LOW_DPI,
+    'high_dpi': HIGH_DPI,
+    'min_confidence': MIN_CONFIDENCE,
+    'max_pixels': MAX_PIXELS,
+}
+
+
+def native_scan_dpi(page):
+    """Resolução (DPI) da imagem digitalizada de maior resolução na página, ou None"""
+    best = None
+    for info in page.get_image_info():
+        x0, y0, x1, y1 = info['bbox']
+        width_in = (x1 - x0) / 72
+        height_in = (y1 - y0) / 72
+        if width_in <= 0 or height_in <= 0:
+            continue
+        dpi = min(info['width'] / width_in, info['height'] / height_in)
+        if best is None or dpi > best:
+            best = dpi
+    return best
+
+
+def choose_zoom(page, target_dpi):
+    """Zoom para a resolução desejada, sem passar da digitalização nem do limite de pixels"""
+    dpi = target_dpi
+
+    # Renderizar acima da resolução da digitalização não acrescenta detalhe
+    scan_dpi = native_scan_dpi(page)
+    if scan_dpi:
+        dpi = min(dpi, scan_dpi)
+
+    zoom = dpi / 72
+    width, height = page.rect.width * zoom, page.rect.height * zoom
+    if width * height > MAX_PIXELS:
+        zoom *= (MAX_PIXELS / (width * height)) ** 0.5
+
+    return zoom
+
+
+def adaptive_ocr_page(page, lang=None, config=''):
+    """OCR com passada em baixa resolução e nova tentativa em alta só se a confiança for baixa"""
+    low_zoom = choose_zoom(page, LOW_DPI)
+    text, confidence = ocr_pixmap_with_confidence(render_gray(page, low_zoom), lang, config)
+    info = {'dpi': round(low_zoom * 72), 'confidence': round(confidence, 1), 'passes': 1}
+
+    if confidence >= MIN_CONFIDENCE:
+        return text, info
+
+    high_zoom = choose_zoom(page, HIGH_DPI)
+    if high_zoom <= low_zoom * 1.05:
+        # A digitalização ou o limite de pixels não permitem resolução maior
+        return text, info
+
+    high_text, high_confidence = ocr_pixmap_with_confidence(render_gray(page, high_zoom), lang, config)
+    info['passes'] = 2
+
+    if high_confidence >= confidence:
+        info.update({'dpi': round(high_zoom * 72), 'confidence': round(high_confidence, 1)})
+        return high_text, info
+
+    return text, info
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Páginas em branco ou com pouca tinta, detectadas antes do OCR
+
+Contratos escaneados trazem versos em branco, folhas de separação e
+páginas só com assinaturas. Cada página escaneada é renderizada em baixa
+resolução e os tons do pixmap são analisados com NumPy (sem laço por
+pixel): a fração de pixels com tinta, bem mais escuros que o fundo, e o
+desvio padrão dos tons. Páginas em branco não passam pelo Tesseract;
+páginas com pouca tinta vão para o fim da fila de OCR, já que ainda podem
+trazer a data das assinaturas.
+
+Sem o NumPy instalado a detecção fica desligada e todas as páginas
+escaneadas seguem para o OCR.
+"""
+
+import os
+
+import fitz  # PyMuPDF
+
+from .stage_timer import stage
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+NUMPY_AVAILABLE = np is not None
+
+# Detecção de páginas em branco (PDF_BLANK_PAGES=0 desliga)
+BLANK_ENABLED = os.environ.get('PDF_BLANK_PAGES', '1') != '0' and NUMPY_AVAILABLE
+
+# Zoom da renderização usada na análise (0.5 = 36 dpi)
+BLANK_ZOOM = float(os.environ.get('PDF_BLANK_ZOOM', '0.5'))
+
+# Fração de cada borda ignorada, onde sombras e bordas do scanner parecem tinta
+MARGIN = float(os.environ.get('PDF_BLANK_MARGIN', '0.05'))
+
+# Diferença mínima para o tom do fundo para o pixel contar como tinta
+INK_CONTRAST = int(os.environ.get('PDF_BLANK_INK_CONTRAST', '60'))
+
+# Página em branco: fração de tinta ou desvio padrão dos tons até esses limites
+BLANK_MAX_INK = float(os.environ.get('PDF_BLANK_MAX_INK', '0.001'))
+BLANK_MAX_STD = float(os.environ.get('PDF_BLANK_MAX_STD', '3.0'))
+
+# Página com pouca tinta (assinaturas, separadores): fração de tinta até esse limite
+LOW_INK_MAX = float(os.environ.get('PDF_LOW_INK_MAX', '0.01'))
+
+# Configuração da detecção (faz parte da chave do cache de extrações)
+BLANK_SETTINGS = {
+    'zoom': BLANK_ZOOM,
+    'margin': MARGIN,
+    'ink_contrast': INK_CONTRAST,
+    'blank_max_ink': BLANK_MAX_INK,
+    'blank_max_std': BLANK_MAX_STD,
+    'low_ink_max': LOW_INK_MAX,
+}
+
+BLANK = 'em_branco'
+LOW_INK = 'pouca_tinta'
+
+
+def gray_array(pix):
+    """Tons do pixmap em tons de cinza como matriz (altura x largura), sem cópia por pixel"""
+    samples = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)
+    return samples[:, :pix.width]
+
+
+def ink_stats(gray, margin=MARGIN, ink_contrast=INK_CONTRAST):
+    """(fração de pixels com tinta, desvio padrão dos tons) de uma matriz em tons de cinza"""
+    height, width = gray.shape
+    dy, dx = int(height * margin), int(width * margin)
+    gray = gray[dy:height - dy, dx:width - dx]
+    if gray.size == 0:
+        return 0.0, 0.0
+
+    # O fundo é o tom dos pixels mais claros, o que também cobre papel amarelado
+    background = np.percentile(gray, 90)
+    ink = np.count_nonzero(gray < background - ink_contrast)
+    return float(ink / gray.size), float(gray.std())
+
+
+def classify_ink(coverage, std):
+    """BLANK, LOW_INK ou None (página normal) pela fração de tinta e pelo desvio padrão"""
+    if coverage <= BLANK_MAX_INK or std <= BLANK_MAX_STD:
+        return BLANK
+    if coverage <= LOW_INK_MAX:
+        return LOW_INK
+    return None
+
+
+def page_ink(page, zoom=BLANK_ZOOM):
+    """Classificação da página renderizada em baixa resolução, ou None se a detecção estiver desligada"""
+    if not BLANK_ENABLED:
+        return None
+
+    try:
+        with stage('blank_check'):
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+            return classify_ink(*ink_stats(gray_array(pix)))
+    except Exception:
+        # Falha na análise não impede o OCR da página
+        return None
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Prazo da extração, para devolver um resultado parcial antes do timeout
+
+O chamador (ex.: PdfOcrProcessor, que mata o script após 30 s) informa
+quantos segundos a extração pode levar. Antes de cada página os
+extratores perguntam se ainda há tempo para ela, estimando o custo pela
+página mais lenta já processada e reservando tempo para a extração dos
+campos. Quando não há, param de iniciar páginas e extraem os campos do
+texto já lido, marcando o resultado como parcial.
+"""
+
+import os
+import time
+
+
+# Prazo padrão em segundos (0 = sem prazo)
+DEADLINE_SECONDS = float(os.environ.get('PDF_DEADLINE_SECONDS', '0')) or None
+
+# Estimativa para a primeira página de OCR, antes de haver medições
+DEFAULT_PAGE_ESTIMATE = float(os.environ.get('PDF_DEADLINE_PAGE_ESTIMATE', '3'))
+
+# Tempo reservado para extrair os campos e gravar a saída
+FIELDS_RESERVE = 1.0
+
+
+class Deadline:
+    """Prazo de uma extração e as páginas processadas dentro dele"""
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+        self.slowest = {}
+        self.pages_covered = []
+        self.page_count = None
+        self.stopped = False
+
+    def remaining(self):
+        """Segundos até o prazo"""
+        return self.expires_at - time.monotonic()
+
+    def allows(self, kind='ocr'):
+        """Indica se ainda há tempo para mais uma página do tipo indicado ('text' ou 'ocr')"""
+        estimate = self.slowest.get(kind, DEFAULT_PAGE_ESTIMATE if kind == 'ocr' else 0.0)
+        if self.remaining() > estimate + FIELDS_RESERVE:
+            return True
+        self.stopped = True
+        return False
+
+    def page_done(self, page_num, kind, elapsed):
+        """Registra uma página processada e quanto ela levou"""
+        self.pages_covered.append(page_num)
+        self.slowest[kind] = max(self.slowest.get(kind, 0.0), elapsed)
+
+    def mark(self, data):
+        """Marca o resultado como parcial se a extração parou pelo prazo"""
+        if self.stopped and isinstance(data, dict) and 'error' not in data:
+            data['partial'] = True
+            data['pages_covered'] = sorted(self.pages_covered)
+            if self.page_count is not None:
+                data['page_count'] = self.page_count
+        return data
+
+
+def start_deadline(seconds):
+    """Cria o prazo da extração, ou None se não houver prazo"""
+    return Deadline(seconds) if seconds else None
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Sessão de documento: o PDF é aberto uma única vez por extração
+
+Todas as etapas (camada de texto, análise das páginas, OCR, caches)
+recebem a mesma sessão em vez do caminho do arquivo, e o PDF não é
+reaberto e reanalisado (xref, fluxos comprimidos) a cada etapa. O
+documento é aberto no primeiro acesso; o texto e a análise de cada
+página são calculados sob demanda e guardados, e as imagens são
+renderizadas quando pedidas.
+
+A sessão aceita o caminho do arquivo, bytes (inclusive um mmap do
+arquivo) ou um stream com read(). Ao ir para um processo do pool de OCR,
+só a origem é copiada; o processo abre o seu próprio documento.
+"""
+
+import os
+import hashlib
+from contextlib import contextmanager
+
+import fitz  # PyMuPDF
+
+from .blank_pages import BLANK, page_ink
+from .extraction_cache import file_sha256
+from .page_analysis import page_needs_ocr
+from .stage_timer import stage
+
+
+class DocumentSession:
+    """PDF aberto uma única vez, com texto, imagens e metadados das páginas sob demanda"""
+
+    def __init__(self, source):
+        if isinstance(source, (str, os.PathLike)):
+            self.path = os.fspath(source)
+            self._data = None
+        elif hasattr(source, 'read'):
+            # Stream: lido uma vez, já que não dá para reabrir nem copiar para outro processo
+            self.path = None
+            self._data = source.read()
+        else:
+            self.path = None
+            self._data = source
+        self._reset()
+
+    def _reset(self):
+        self._doc = None
+        self._sha256 = None
+        self._layers = {}
+        self._ink = {}
+
+    def __getstate__(self):
+        # Para o pool de processos: só a origem; o documento é reaberto no processo
+        return {'path': self.path, '_data': self._data}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def name(self):
+        """Caminho do arquivo, ou '<memória>' para documentos abertos a partir de bytes"""
+        return self.path or '<memória>'
+
+    @property
+    def doc(self):
+        """Documento do PyMuPDF, aberto no primeiro acesso"""
+        if self._doc is None:
+            with stage('open'):
+                if self.path is not None:
+                    self._doc = fitz.open(self.path)
+                else:
+                    # O PyMuPDF aceita bytes e bytearray; mmap e memoryview são copiados uma vez
+                    data = self._data if isinstance(self._data, (bytes, bytearray)) else bytes(self._data)
+                    self._doc = fitz.open(stream=data, filetype='pdf')
+        return self._doc
+
+    @property
+    def page_count(self):
+        return len(self.doc)
+
+    @property
+    def metadata(self):
+        """Metadados do PDF (título, autor, produtor, ...)"""
+        return self.doc.metadata or {}
+
+    @property
+    def needs_pass(self):
+        """Se o PDF é protegido por senha"""
+        return bool(self.doc.needs_pass)
+
+    @property
+    def sha256(self):
+        """SHA-256 do conteúdo, calculado uma vez para o cache de extrações e o de páginas"""
+        if self._sha256 is None:
+            if self.path is not None:
+                self._sha256 = file_sha256(self.path)
+            else:
+                self._sha256 = hashlib.sha256(self._data).hexdigest()
+        return self._sha256
+
+    def page(self, page_num):
+        """Página carregada (para renderização e OCR)"""
+        return self.doc.load_page(page_num)
+
+    def _layer(self, page_num):
+        """(texto da camada de texto, precisa de OCR), lidos uma única vez por página"""
+        layer = self._layers.get(page_num)
+        if layer is None:
+            page = self.page(page_num)
+            with stage('text_layer'):
+                page_text = page.get_text()
+            layer = self._layers[page_num] = (page_text, page_needs_ocr(page, page_text))
+        return layer
+
+    def text(self, page_num):
+        """Texto da camada de texto da página"""
+        return self._layer(page_num)[0]
+
+    def needs_ocr(self, page_num):
+        """Se a página precisa de OCR (page_analysis)"""
+        return self._layer(page_num)[1]
+
+    def ink(self, page_num):
+        """Tinta da página (blank_pages.BLANK, LOW_INK ou None), analisada uma única vez"""
+        if page_num not in self._ink:
+            self._ink[page_num] = page_ink(self.page(page_num))
+        return self._ink[page_num]
+
+    @property
+    def blank_pages(self):
+        """Páginas analisadas até agora e detectadas em branco"""
+        return sorted(page_num for page_num, ink in self._ink.items() if ink == BLANK)
+
+    def close(self):
+        """Fecha o documento; a sessão pode reabri-lo se for usada de novo"""
+        if self._doc is not None:
+            self._doc.close()
+        self._reset()
+
+
+@contextmanager
+def document_session(source):
+    """Sessão para a origem informada; uma sessão recebida pronta continua aberta para quem a criou"""
+    if isinstance(source, DocumentSession):
+        yield source
+        return
+
+    session = DocumentSession(source)
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Cache em disco dos resultados de extração, endereçado pelo conteúdo do PDF
+
+A chave combina o SHA-256 do arquivo, o nome do extrator e a versão do
+extrator, de modo que reenvios do mesmo contrato não repetem leitura de
+texto nem OCR. As entradas são removidas por LRU quando o diretório passa
+do tamanho máximo configurado. Para não percorrer o diretório a cada
+gravação, um contador aproximado do tamanho fica em um arquivo na raiz do
+cache; o diretório só é varrido quando o contador passa do limite ou a
+cada PDF_EXTRACTION_CACHE_EVICT_EVERY gravações (o que também conta os
+textos por página, que não passam pelo contador).
+
+O texto OCR de cada página também é gravado assim que a página termina,
+para que uma nova tentativa após o timeout só processe as páginas que
+faltam.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / 'storage' / 'app' / 'extraction-cache'
+
+CACHE_ENABLED = os.environ.get('PDF_EXTRACTION_CACHE', '1') != '0'
+CACHE_DIR = Path(os.environ.get('PDF_EXTRACTION_CACHE_DIR', DEFAULT_CACHE_DIR))
+CACHE_MAX_BYTES = int(os.environ.get('PDF_EXTRACTION_CACHE_MAX_MB', '256')) * 1024 * 1024
+
+# Gravações entre duas varreduras completas do diretório, mesmo abaixo do limite
+EVICT_EVERY = max(int(os.environ.get('PDF_EXTRACTION_CACHE_EVICT_EVERY', '50')), 1)
+
+# Arquivo com o tamanho aproximado do cache e as gravações desde a última varredura
+USAGE_FILE = '.usage.json'
+
+
+def _write_atomic(path, content):
+    """Grava o conteúdo em um arquivo temporário e o move para o destino"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Calcula o SHA-256 do conteúdo de um arquivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Cache de texto por página e campos extraídos, com remoção LRU por tamanho"""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+        self.max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    def make_key(self, session, extractor, version, options=None):
+        """Monta a chave a partir do hash do documento (DocumentSession), da versão do extrator e das opções que mudam o resultado"""
+        key = f"{session.sha256}-{extractor}-{version}"
+        if options:
+            options_key = json.dumps(options, sort_keys=True)
+            key += '-' + hashlib.sha256(options_key.encode('utf-8')).hexdigest()[:16]
+        return key
+
+    def _entry_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """Retorna a entrada {'pages': [...], 'data': {...}} ou None"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Marca a entrada como usada recentemente para o LRU
+            os.utime(path)
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, pages, data):
+        """Grava uma entrada de forma atômica e aplica o limite de tamanho"""
+        path = self._entry_path(key)
+        content = json.dumps({'pages': pages, 'data': data}, ensure_ascii=False)
+        try:
+            _write_atomic(path, content)
+        except OSError:
+            # Cache indisponível não deve impedir a extração
+            return
+
+        usage = self._read_usage()
+        if usage is None:
+            # Sem contador (cache novo ou arquivo ilegível): a varredura o recria
+            self.evict()
+            return
+
+        usage['bytes'] += len(content.encode('utf-8'))
+        usage['puts'] += 1
+        if usage['bytes'] > self.max_bytes or usage['puts'] >= EVICT_EVERY:
+            self.evict()
+        else:
+            self._write_usage(usage)
+
+    def _read_usage(self):
+        """Contador {'bytes', 'puts'} gravado na última atualização, ou None"""
+        try:
+            with open(self.cache_dir / USAGE_FILE, 'r', encoding='utf-8') as f:
+                usage = json.load(f)
+            return {'bytes': int(usage['bytes']), 'puts': int(usage['puts'])}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_usage(self, usage):
+        try:
+            _write_atomic(self.cache_dir / USAGE_FILE, json.dumps(usage))
+        except OSError:
+            pass
+
+    def evict(self):
+        """Remove as entradas usadas há mais tempo até caber no tamanho máximo e acerta o contador"""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name == USAGE_FILE and root == str(self.cache_dir):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total > self.max_bytes:
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= size
+                except OSError:
+                    continue
+
+        self._write_usage({'bytes': total, 'puts': 0})
+
+
+class PageTextCache:
+    """Texto OCR por página de um documento, para uma configuração de renderização"""
+
+    def __init__(self, doc_hash, settings, cache_dir=None):
+        # Zoom, idioma e config do Tesseract mudam o texto, então entram na chave
+        settings_key = json.dumps(settings, sort_keys=True)
+        settings_hash = hashlib.sha256(settings_key.encode('utf-8')).hexdigest()[:16]
+        base_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+        self.pages_dir = base_dir / 'pages' / doc_hash[:2] / doc_hash / settings_hash
+
+    def _page_path(self, page_num):
+        return self.pages_dir / f"{page_num}.txt"
+
+    def get(self, page_num):
+        """Retorna o texto já processado da página ou None"""
+        try:
+            with open(self._page_path(page_num), 'r', encoding='utf-8', newline='') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, page_num, text):
+        """Grava o texto de uma página assim que ela termina"""
+        try:
+            _write_atomic(self._page_path(page_num), text)
+        except OSError:
+            pass
+
+
+def open_page_cache(session, settings):
+    """Retorna o cache de páginas do documento (DocumentSession), ou None se o cache estiver desativado"""
+    if not CACHE_ENABLED:
+        return None
+    try:
+        return PageTextCache(session.sha256, settings)
+    except OSError:
+        return None
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Extração dos dados de um contrato com um preset
+
+Junta as peças comuns a todos os presets: cache de extrações, métricas por
+etapa, prazo com resultado parcial, leitura das páginas (pages.py) e o
+conjunto de campos do preset. O modo de streaming emite um registro por
+página lida antes dos campos.
+
+O PDF é aberto uma única vez por extração (DocumentSession); `source`
+pode ser o caminho do arquivo, bytes, um stream ou uma sessão já aberta.
+"""
+
+import os
+
+from .blank_pages import BLANK_ENABLED, BLANK_SETTINGS
+from .deadline import DEADLINE_SECONDS, start_deadline
+from .document import document_session
+from .extraction_cache import CACHE_ENABLED, ExtractionCache
+from .layouts import LAYOUT_SETTINGS, REGIONS_ENABLED
+from .page_priority import PRIORITY_ENABLED, PRIORITY_SETTINGS
+from .pages import extract_pages, join_pages
+from .presets import get_preset
+from .stage_timer import METRICS_ENABLED, measure_extraction, record, stage
+
+
+# Modo incremental: para de ler páginas quando os campos obrigatórios forem encontrados
+EARLY_EXIT = os.environ.get('PDF_EARLY_EXIT', '0') == '1'
+
+# Limite adicional de páginas (0 = usa apenas o orçamento do preset)
+MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', '0')) or None
+
+
+def _cache_options(preset, early_exit, max_pages):
+    """Opções que mudam o resultado e por isso entram na chave do cache"""
+    options = {name: preset.ocr_settings[name] for name in ('adaptive', 'low_memory', 'preprocess') if name in preset.ocr_settings}
+    if PRIORITY_ENABLED:
+        options['priority'] = PRIORITY_SETTINGS
+    if BLANK_ENABLED:
+        options['blank'] = BLANK_SETTINGS
+    if REGIONS_ENABLED:
+        options['regions'] = LAYOUT_SETTINGS
+    if not early_exit and not max_pages and not options:
+        return None
+    options.update({'early_exit': early_exit, 'max_pages': max_pages})
+    return options
+
+
+def _cached_result(session, preset, use_cache, early_exit, max_pages):
+    """Retorna (cache, chave, dados em cache ou None)"""
+    if not use_cache:
+        return None, None, None
+
+    cache = ExtractionCache()
+    cache_key = cache.make_key(session, preset.name, preset.version, _cache_options(preset, early_exit, max_pages))
+    entry = cache.get(cache_key)
+    if entry:
+        record('cached', True)
+        return cache, cache_key, entry['data']
+    return cache, cache_key, None
+
+
+def _read_pages(session, preset, early_exit, max_pages, deadline, on_page=None):
+    """Lê as páginas; presets com resultado para PDF sem texto tratam falhas de leitura como PDF sem texto"""
+    try:
+        return extract_pages(session, preset, early_exit, max_pages, deadline, on_page)
+    except Exception:
+        if preset.empty_result is None:
+            raise
+        return [], "Erro na leitura do PDF"
+
+
+def _with_blank_pages(session, data):
+    """Registra no resultado as páginas em branco que não passaram pelo OCR"""
+    if session.blank_pages:
+        data['blank_pages'] = session.blank_pages
+    return data
+
+
+def _build_result(session, preset, page_texts, metodo, deadline):
+    """Retorna (dados, pode ir para o cache)"""
+    text = join_pages(page_texts)
+
+    if not text.strip():
+        if preset.empty_result is None:
+            raise Exception("Não foi possível extrair texto do PDF")
+        # Dados básicos para revisão manual
+        return _with_blank_pages(session, dict(preset.empty_result)), False
+
+    with stage('fields'):
+        data = preset.fields.extract(text)
+    data['metodo'] = metodo
+    _with_blank_pages(session, data)
+
+    # Resultado parcial não vai para o cache; as páginas com OCR já ficaram no cache de páginas
+    if deadline and deadline.stopped:
+        return deadline.mark(data), False
+
+    return data, True
+
+
+def extract_contract_data(source, preset='pdf', use_cache=CACHE_ENABLED, early_exit=EARLY_EXIT, max_pages=MAX_PAGES, metrics=METRICS_ENABLED, deadline=DEADLINE_SECONDS):
+    """Extrai os dados do contrato com o preset indicado (deadline em segundos; ao estourar, resultado parcial)"""
+    try:
+        preset = get_preset(preset)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    with document_session(source) as session:
+        with measure_extraction(preset.name, session.name, metrics) as measurement:
+            data = _extract_contract_data(session, preset, use_cache, early_exit, max_pages, start_deadline(deadline))
+    return measurement.attach(data)
+
+
+def _extract_contract_data(session, preset, use_cache, early_exit, max_pages, deadline):
+    """Extrai os dados do contrato, usando o cache de extrações se ativo"""
+    try:
+        # Reenvios do mesmo arquivo são atendidos pelo cache, sem OCR
+        cache, cache_key, cached = _cached_result(session, preset, use_cache, early_exit, max_pages)
+        if cached is not None:
+            return cached
+
+        page_texts, metodo = _read_pages(session, preset, early_exit, max_pages, deadline)
+        data, cacheable = _build_result(session, preset, page_texts, metodo, deadline)
+
+        if cache and cacheable:
+            cache.put(cache_key, page_texts, data)
+
+        return data
+
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def get_page_count(source):
+    """Retorna o número de páginas do PDF"""
+    with document_session(source) as session:
+        return session.page_count
+
+
+def stream_contract_data(source, emit, preset='pdf', use_cache=CACHE_ENABLED, early_exit=EARLY_EXIT, max_pages=MAX_PAGES, metrics=METRICS_ENABLED, deadline=DEADLINE_SECONDS):
+    """Extrai os dados emitindo registros por página e, ao final, os campos (e as métricas, se pedidas)"""
+    try:
+        preset = get_preset(preset)
+    except ValueError as e:
+        emit({'type': 'error', 'error': str(e)})
+        return
+
+    with document_session(source) as session:
+        with measure_extraction(preset.name, session.name, metrics) as measurement:
+            _stream_contract_data(session, emit, preset, use_cache, early_exit, max_pages, start_deadline(deadline))
+
+    if metrics and measurement.metrics is not None:
+        emit({'type': 'metrics', 'metrics': measurement.metrics})
+
+
+def _stream_contract_data(session, emit, preset, use_cache, early_exit, max_pages, deadline):
+    """Emite os registros do documento, das páginas e dos campos"""
+    try:
+        cache, cache_key, cached = _cached_result(session, preset, use_cache, early_exit, max_pages)
+        if cached is not None:
+            emit({'type': 'fields', 'cached': True, 'data': cached})
+            return
+
+        page_count = session.page_count
+        emit({'type': 'document', 'page_count': page_count})
+
+        def on_page(page_num, page_text, metodo):
+            emit({
+                'type': 'page',
+                'page': page_num,
+                'page_count': page_count,
+                'metodo': metodo,
+                'text': page_text,
+            })
+
+        page_texts, metodo = _read_pages(session, preset, early_exit, max_pages, deadline, on_page)
+        data, cacheable = _build_result(session, preset, page_texts, metodo, deadline)
+
+        if cache and cacheable:
+            cache.put(cache_key, page_texts, data)
+
+        emit({'type': 'fields', 'cached': False, 'data': data})
+
+    except Exception as e:
+        emit({'type': 'error', 'error': str(e)})
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Motor de extração de campos com padrões pré-compilados
+
+Os padrões são compilados uma única vez na importação do módulo e o texto
+do documento é convertido para minúsculas uma única vez. Cada padrão que
+começa com um literal (ex.: "valor", "contratad") só é executado se o
+literal aparecer no documento, e a busca começa na primeira ocorrência
+dele, em vez de varrer o texto inteiro a cada padrão. A ordem de
+prioridade entre os padrões de um campo é mantida.
+
+Não é um motor de passada única: search_first ainda roda um padrão por
+vez, só que filtrado pelo literal. Unir os padrões de um campo numa
+alternância com grupos nomeados ficou mais lento, porque o re deixa de
+usar a busca rápida pelo literal inicial de cada padrão.
+"""
+
+import re
+
+
+# Caracteres em que a busca sem distinção de maiúsculas do re difere de str.lower()
+_CASE_EXCEPTIONS = ('ſ', 'K')
+
+# Escapes que representam o próprio caractere
+_ESCAPED_LITERALS = set('$.-/,:')
+
+# Quantificadores que tornam o caractere anterior opcional
+_OPTIONAL_QUANTIFIERS = set('?*{')
+
+
+def literal_prefix(pattern):
+    """Retorna o literal com que todo casamento do padrão começa, ou None"""
+    if _has_top_level_alternation(pattern):
+        return None
+
+    prefix = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            if i + 1 < len(pattern) and pattern[i + 1] in _ESCAPED_LITERALS:
+                prefix.append(pattern[i + 1])
+                i += 2
+                continue
+            break
+        if char in _OPTIONAL_QUANTIFIERS:
+            # O último caractere pode não aparecer no casamento
+            if prefix:
+                prefix.pop()
+            break
+        if char == '+':
+            break
+        if not (char.isalnum() or char in ' ,-:'):
+            break
+        prefix.append(char)
+        i += 1
+
+    literal = ''.join(prefix)
+    return literal if literal and literal == literal.lower() else None
+
+
+def _has_top_level_alternation(pattern):
+    """Indica se o padrão tem um '|' fora de grupos e classes"""
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+class PreparedText:
+    """Texto do documento com a versão em minúsculas calculada uma única vez"""
+
+    def __init__(self, text):
+        self.text = text
+        self.lower = text.lower()
+        # Posições em self.lower só valem em self.text se o tamanho não mudou
+        self.aligned = len(self.lower) == len(text)
+        self.prefilter = not any(char in text for char in _CASE_EXCEPTIONS)
+        self._positions = {}
+
+    def find(self, literal):
+        """Primeira posição do literal (em minúsculas) no documento, ou -1"""
+        position = self._positions.get(literal)
+        if position is None:
+            position = self.lower.find(literal)
+            self._positions[literal] = position
+        return position
+
+    def contains(self, literal):
+        """Indica se o literal (em minúsculas) aparece no documento"""
+        return self.find(literal) >= 0
+
+
+def prepare(text):
+    """Prepara o texto para a extração, reaproveitando se já estiver preparado"""
+    if isinstance(text, PreparedText):
+        return text
+    return PreparedText(text)
+
+
+class Pattern:
+    """Padrão compilado com o literal que inicia obrigatoriamente cada casamento"""
+
+    def __init__(self, pattern, flags=re.IGNORECASE):
+        self.regex = re.compile(pattern, flags)
+        self.prefix = literal_prefix(pattern) if flags & re.IGNORECASE else None
+
+    def search(self, doc):
+        """Busca o padrão no documento preparado"""
+        start = 0
+        if self.prefix and doc.prefilter:
+            position = doc.find(self.prefix)
+            if position < 0:
+                return None
+            if doc.aligned:
+                start = position
+        return self.regex.search(doc.text, start)
+
+
+def compile_patterns(patterns, flags=re.IGNORECASE):
+    """Compila uma lista de padrões, mantendo a ordem de prioridade"""
+    return [Pattern(pattern, flags) for pattern in patterns]
+
+
+def search_first(doc, patterns):
+    """Retorna o casamento do primeiro padrão (em ordem de prioridade) que casar"""
+    for pattern in patterns:
+        match = pattern.search(doc)
+        if match:
+            return match
+    return None
+
+
+def find_first_literal(doc, candidates):
+    """Retorna o valor do primeiro candidato (valor, literal) cujo literal aparece no documento"""
+    for value, literal in candidates:
+        if doc.contains(literal):
+            return value
+    return None
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Conjuntos de campos extraídos do texto dos contratos
+
+Um conjunto de campos recebe o texto do documento e devolve o dicionário
+de dados do contrato. Também informa quais campos encerram a leitura no
+modo incremental (`required`) e quais orientam a ordem do OCR no modo por
+prioridade (`priority`). Os conjuntos básicos ficam aqui; o completo, com
+todos os padrões de cada campo, em full_fields.py.
+"""
+
+import re
+
+from .field_engine import Pattern, compile_patterns, prepare
+from .parsers import parse_date, parse_decimal
+
+
+# Campos que encerram a leitura no modo incremental
+REQUIRED_FIELDS = ('numero_contrato', 'valor', 'cnpj_contratado', 'data_inicio')
+
+
+def normalize_text(text):
+    """Normaliza o texto para facilitar extração"""
+    if not text:
+        return ""
+
+    # Remove quebras de linha excessivas
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    # Remove espaços múltiplos
+    text = re.sub(r'[ \t]+', ' ', text)
+    return text.strip()
+
+
+class FieldSet:
+    """Conjunto de campos: extração a partir do texto e campos que guiam a leitura das páginas"""
+
+    def __init__(self, required=REQUIRED_FIELDS, priority=None):
+        self.required = tuple(required)
+        self.priority = tuple(priority or required)
+
+    def extract(self, text):
+        """Dados do contrato extraídos do texto"""
+        raise NotImplementedError
+
+    def missing(self, text, names=None):
+        """Campos (por padrão os obrigatórios) ainda não encontrados no texto"""
+        data = self.extract(text) if text.strip() else {}
+        return [name for name in names or self.required if data.get(name) is None]
+
+
+# Padrões compilados uma única vez, na importação do módulo
+NUMERO_PATTERN = Pattern(r'n[°º]\s*([0-9\/\-\.]+)')
+OBJETO_PATTERN = Pattern(r'objeto[:\s]+([^\n]{10,500})')
+CONTRATANTE_PATTERN = Pattern(r'companhia\s*de\s*desenvolvimento\s*de\s*maric[áa][^\n]{5,100}')
+CONTRATADO_PATTERN = Pattern(r'destaq\s*com[ée]rcio\s*e\s*servi[çc]os[^\n]{5,100}')
+DATA_INICIO_PATTERN = Pattern(r'data\s*do\s*in[íi]cio[:\s]*([\d\/\-\.]+)')
+DATA_FINAL_PATTERN = Pattern(r'maric[áa],\s*([\d\s]+de\s+[a-zç]+\s+de\s+[\d]+)')
+PREVISAO_PATTERN = Pattern(r'lei\s*n[°º]?\s*13\.303[^\n]{10,200}')
+CNPJ_PATTERN = re.compile(r'(\d{2}\.?\d{3}\.?\d{3}\/?\d{4}\-?\d{2})')
+NAO_DIGITO_PATTERN = re.compile(r'[^\d]')
+
+# Valor: sempre por "VALOR DO CONTRATO" ou "VALOR TOTAL"
+VALOR_PATTERNS = compile_patterns([
+    r'valor\s*total\s*r\$\s*([\d\.,]+)',
+    r'valor\s*do\s*contrato[^\d]*r\$\s*([\d\.,]+)',
+    r'valor\s*total\s*de\s*r\$\s*([\d\.,]+)',
+    r'd[áa]-se\s*a\s*este\s*contrato\s*o\s*valor\s*total\s*de\s*r\$\s*([\d\.,]+)',
+])
+
+# Valor: também a cláusula sexta e, por último, qualquer "R$"
+VALOR_PATTERNS_AMPLOS = compile_patterns([
+    r'valor\s*total\s*r\$\s*([\d\.,]+)',
+    r'valor\s*do\s*contrato[^\d]*r\$\s*([\d\.,]+)',
+    r'valor\s*total\s*de\s*r\$\s*([\d\.,]+)',
+    r'd[áa]-se\s*a\s*este\s*contrato\s*o\s*valor\s*total\s*de\s*r\$\s*([\d\.,]+)',
+    r'cl[áa]usula\s*sexta[^\d]*valor[^\d]*r\$\s*([\d\.,]+)',
+    r'r\$\s*([\d\.,]+)',
+])
+
+
+class BasicFieldSet(FieldSet):
+    """Campos básicos (número, objeto, partes, CNPJ, valor, início), com um padrão por campo"""
+
+    def __init__(self, valor_patterns=VALOR_PATTERNS, valor_range=None, text_limit=5000, signature=False, priority=None):
+        super().__init__(REQUIRED_FIELDS, priority)
+        self.valor_patterns = valor_patterns
+        # (mínimo, máximo) aceitos para o valor, ou None para aceitar qualquer um
+        self.valor_range = valor_range
+        self.text_limit = text_limit
+        # Inclui a data das assinaturas e a previsão legal
+        self.signature = signature
+
+    def extract(self, text):
+        """Extrai dados básicos do texto"""
+        if not text:
+            return {}
+
+        text = normalize_text(text)
+
+        # Minúsculas calculadas uma única vez para todos os padrões
+        doc = prepare(text)
+
+        data = {}
+
+        # Número do contrato
+        numero_match = NUMERO_PATTERN.search(doc)
+        if numero_match:
+            data['numero_contrato'] = numero_match.group(1).strip()
+
+        # Objeto
+        objeto_match = OBJETO_PATTERN.search(doc)
+        if objeto_match:
+            objeto = objeto_match.group(1).strip()
+            if len(objeto) > 500:
+                objeto = objeto[:500] + '...'
+            data['objeto'] = objeto
+
+        # Contratante
+        contratante_match = CONTRATANTE_PATTERN.search(doc)
+        if contratante_match:
+            data['contratante'] = contratante_match.group(0).strip()
+        else:
+            data['contratante'] = 'Companhia de Desenvolvimento de Maricá - CODEMAR'
+
+        # Contratado
+        contratado_match = CONTRATADO_PATTERN.search(doc)
+        if contratado_match:
+            data['contratado'] = contratado_match.group(0).strip()
+
+        # CNPJ
+        cnpj_match = CNPJ_PATTERN.search(text)
+        if cnpj_match:
+            cnpj = NAO_DIGITO_PATTERN.sub('', cnpj_match.group(1))
+            if len(cnpj) == 14:
+                data['cnpj_contratado'] = f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:14]}"
+
+        # Valor - procura pelos padrões em ordem de prioridade
+        for pattern in self.valor_patterns:
+            valor_match = pattern.search(doc)
+            if valor_match:
+                valor = parse_decimal(valor_match.group(1))
+                if valor is None:
+                    continue
+                # Só aceita valores razoáveis, quando há faixa definida
+                if self.valor_range and not self.valor_range[0] <= valor <= self.valor_range[1]:
+                    continue
+                data['valor'] = valor
+                break
+
+        # Data de início
+        data_inicio_match = DATA_INICIO_PATTERN.search(doc)
+        if data_inicio_match:
+            data['data_inicio'] = parse_date(data_inicio_match.group(1))
+
+        if self.signature:
+            # Data final do documento
+            data_final_match = DATA_FINAL_PATTERN.search(doc)
+            if data_final_match:
+                data['data_final_documento'] = parse_date(data_final_match.group(1))
+
+            # Previsão legal
+            previsao_match = PREVISAO_PATTERN.search(doc)
+            if previsao_match:
+                data['previsao_legal'] = previsao_match.group(0).strip()
+
+        # Status e outros campos padrão
+        data['status'] = 'vigente'
+        data['secretaria'] = 'Diretoria de Administração'
+        data['texto_extraido'] = text[:self.text_limit]
+
+        return data
+
+
+# Preset 'simple': padrões de valor estritos, data das assinaturas e 8000 caracteres de texto
+BASIC_FIELDS = BasicFieldSet(
+    text_limit=8000,
+    signature=True,
+    priority=REQUIRED_FIELDS + ('data_final_documento',),
+)
+
+# Preset 'minimal': qualquer "R$" serve, desde que o valor esteja entre 100 e 100 milhões
+MINIMAL_FIELDS = BasicFieldSet(
+    valor_patterns=VALOR_PATTERNS_AMPLOS,
+    valor_range=(100, 100000000),
+)
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Conjunto completo de campos dos contratos da CODEMAR
+
+Cada campo tem sua lista de padrões, em ordem de prioridade, e uma função
+de extração; além dos campos básicos inclui término, modalidade, tipo de
+contrato, secretaria, fonte de recurso, previsão legal e a data das
+assinaturas. É o conjunto do preset 'pdf'.
+"""
+
+import re
+
+from .field_engine import compile_patterns, find_first_literal, prepare, search_first
+from .fields import FieldSet, normalize_text
+from .parsers import parse_date, parse_decimal
+
+
+NUMERO_CONTRATO_PATTERNS = compile_patterns([
+    r'n[°º]\s*([0-9\/\-\.]+)',
+    r'contrato\s*n[°º]?\s*[:\s]*([0-9\/\-\.]+)',
+    r'n[úu]mero\s*(?:do\s*)?contrato[:\s]+([^\n]{1,50})',
+    r'termo\s*de\s*contrato\s*n[°º]?\s*([0-9\/\-\.]+)',
+])
+
+
+def extract_numero_contrato(text):
+    """Extrai número do contrato"""
+    match = search_first(prepare(text), NUMERO_CONTRATO_PATTERNS)
+    if match:
+        return match.group(1).strip()
+    
+    return None
+
+
+OBJETO_PATTERNS = compile_patterns([
+    r'objeto[:\s]+([^\n]{10,800})',
+    r'objeto\s*do\s*contrato[:\s]+([^\n]{10,800})',
+    r'1[°º]\s*uso\s*da\s*ata[^\n]{10,800}',
+    r'contrata[çc][ãa]o\s*de\s*empresa[^\n]{10,800}',
+])
+
+
+def extract_objeto(text):
+    """Extrai objeto do contrato"""
+    match = search_first(prepare(text), OBJETO_PATTERNS)
+    if match:
+        objeto = match.group(0) if match.group(0) else match.group(1)
+        objeto = objeto.strip()
+        if len(objeto) > 500:
+            objeto = objeto[:500] + '...'
+        return objeto
+    
+    return None
+
+
+CONTRATANTE_PATTERNS = compile_patterns([
+    r'contratante[:\s]+([^\n]{5,200})',
+    r'companhia\s*de\s*desenvolvimento\s*de\s*maric[áa][^\n]{5,100}',
+    r'codemar[^\n]{5,100}',
+    r'munic[íi]pio\s*de\s*([^\n]{5,100})',
+    r'prefeitura\s*municipal\s*de\s*([^\n]{5,100})',
+])
+
+
+def extract_contratante(text):
+    """Extrai contratante"""
+    match = search_first(prepare(text), CONTRATANTE_PATTERNS)
+    if match:
+        contratante = match.group(0) if match.group(0) else match.group(1)
+        contratante = contratante.strip()
+        if len(contratante) > 200:
+            contratante = contratante[:200]
+        return contratante
+    
+    return 'Companhia de Desenvolvimento de Maricá - CODEMAR'
+
+
+CNPJ_SUFIXO_PATTERN = re.compile(r'\s*-?\s*cnpj.*$', re.IGNORECASE)
+
+CONTRATADO_PATTERNS = compile_patterns([
+    r'contratad[ao][:\s]+([^\n]{5,200})',
+    r'destaq\s*com[ée]rcio\s*e\s*servi[çc]os[^\n]{5,100}',
+    r'empresa[:\s]+([^\n]{5,200})',
+])
+
+
+def extract_contratado(text):
+    """Extrai contratado"""
+    match = search_first(prepare(text), CONTRATADO_PATTERNS)
+    if match:
+        contratado = match.group(0) if match.group(0) else match.group(1)
+        contratado = CNPJ_SUFIXO_PATTERN.sub('', contratado)
+        contratado = contratado.strip()
+        if len(contratado) > 200:
+            contratado = contratado[:200]
+        return contratado
+    
+    return None
+
+
+CNPJ_PATTERN = re.compile(r'(\d{2}\.?\d{3}\.?\d{3}\/?\d{4}\-?\d{2})')
+NAO_DIGITO_PATTERN = re.compile(r'[^\d]')
+
+
+def extract_cnpj(text):
+    """Extrai CNPJ"""
+    match = CNPJ_PATTERN.search(prepare(text).text)
+    
+    if match:
+        cnpj = NAO_DIGITO_PATTERN.sub('', match.group(1))
+        if len(cnpj) == 14:
+            return f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:14]}"
+    
+    return None
+
+
+VALOR_PATTERNS = compile_patterns([
+    r'valor\s*(?:global|total)?[:\s]*r\$?\s*([\d\.,]+)',
+    r'valor\s*do\s*contrato[:\s]*r\$?\s*([\d\.,]+)',
+    r'd[áa]-se\s*a\s*este\s*contrato\s*o\s*valor\s*total\s*de\s*r\$\s*([\d\.,]+)',
+    r'r\$\s*([\d\.,]+)',
+])
+
+
+def extract_valor(text):
+    """Extrai valor do contrato"""
+    match = search_first(prepare(text), VALOR_PATTERNS)
+    if match:
+        return parse_decimal(match.group(1))
+    
+    return None
+
+
+DATA_INICIO_PATTERNS = compile_patterns([
+    r'data\s*do\s*in[íi]cio[:\s]*([\d\/\-\.]+)',
+    r'data\s*(?:de\s*)?in[íi]cio[:\s]*([\d\/\-\.]+)',
+    r'in[íi]cio[:\s]*([\d\/\-\.]+)',
+    r'vig[êe]ncia[:\s]*(?:de\s*)?([\d\/\-\.]+)',
+    r'contrdata[:\s]*([\d\/\-\.]+)',
+])
+
+
+def extract_data_inicio(text):
+    """Extrai data de início (CONTRADATA)"""
+    match = search_first(prepare(text), DATA_INICIO_PATTERNS)
+    if match:
+        return parse_date(match.group(1))
+    
+    return None
+
+
+DATA_FIM_PATTERNS = compile_patterns([
+    r'data\s*(?:de\s*)?t[ée]rmino[:\s]*([\d\/\-\.]+)',
+    r'data\s*(?:de\s*)?fim[:\s]*([\d\/\-\.]+)',
+    r't[ée]rmino[:\s]*([\d\/\-\.]+)',
+    r'at[ée][:\s]*([\d\/\-\.]+)',
+])
+
+
+def extract_data_fim(text):
+    """Extrai data de fim/término"""
+    match = search_first(prepare(text), DATA_FIM_PATTERNS)
+    if match:
+        return parse_date(match.group(1))
+    
+    return None
+
+
+# Datas de leis e decretos ("Lei nº 13.303, de 30 de junho de 2016", "Lei nº 8.666 de 21 de junho
+# de 1993") vêm depois de "de " ou do número do ato e não são a data das assinaturas
+DATA_FINAL_DOCUMENTO_PATTERNS = compile_patterns([
+    r'maric[áa],\s*([\d\s]+de\s+[a-zç]+\s+de\s+[\d]+)',
+    r'(?<![\d\.\/])(?<!de\s)(?<!\d\s)([\d]+\s+de\s+[a-zç]+\s+de\s+[\d]+)',
+    r'data[:\s]*([\d\/\-\.]+)',
+])
+
+
+def extract_data_final_documento(text):
+    """Extrai data final do documento (data das assinaturas)"""
+    match = search_first(prepare(text), DATA_FINAL_DOCUMENTO_PATTERNS)
+    if match:
+        return parse_date(match.group(1))
+    
+    return None
+
+
+PREVISAO_LEGAL_PATTERNS = compile_patterns([
+    r'previs[ãa]o\s*legal[:\s]*([^\n]{10,200})',
+    r'lei\s*n[°º]?\s*13\.303[^\n]{10,200}',
+    r'procedimento\s*licitat[óo]rio[^\n]{10,200}',
+    r'processo\s*administrativo[^\n]{10,200}',
+])
+
+
+def extract_previsao_legal(text):
+    """Extrai previsão legal"""
+    match = search_first(prepare(text), PREVISAO_LEGAL_PATTERNS)
+    if match:
+        previsao = match.group(0) if match.group(0) else match.group(1)
+        previsao = previsao.strip()
+        if len(previsao) > 200:
+            previsao = previsao[:200] + '...'
+        return previsao
+    
+    return None
+
+
+MODALIDADES = [
+    'Pregão Eletrônico',
+    'Pregão Presencial',
+    'Concorrência',
+    'Tomada de Preços',
+    'Convite',
+    'Dispensa',
+    'Inexigibilidade',
+]
+
+# (modalidade, literal em minúsculas), na ordem de prioridade
+MODALIDADE_CANDIDATES = [(modalidade, modalidade.lower()) for modalidade in MODALIDADES]
+
+
+def extract_modalidade(text):
+    """Extrai modalidade"""
+    return find_first_literal(prepare(text), MODALIDADE_CANDIDATES)
+
+
+TIPOS_CONTRATO = {
+    'Prestação de Serviços': ['prestação de serviços', 'serviços'],
+    'Fornecimento': ['fornecimento', 'aquisição'],
+    'Obra': ['obra', 'construção'],
+    'Compra': ['compra', 'aquisição'],
+}
+
+# (tipo, palavra-chave em minúsculas), na ordem de prioridade
+TIPO_CONTRATO_CANDIDATES = [
+    (tipo, palavra.lower())
+    for tipo, palavras_chave in TIPOS_CONTRATO.items()
+    for palavra in palavras_chave
+]
+
+
+def extract_tipo_contrato(text):
+    """Extrai tipo de contrato"""
+    return find_first_literal(prepare(text), TIPO_CONTRATO_CANDIDATES)
+
+
+SECRETARIA_PATTERNS = compile_patterns([
+    r'secretaria\s*(?:de|municipal\s*de)?\s*([^\n]{5,100})',
+    r'diretoria\s*(?:de)?\s*([^\n]{5,100})',
+])
+
+
+def extract_secretaria(text):
+    """Extrai secretaria/diretoria"""
+    match = search_first(prepare(text), SECRETARIA_PATTERNS)
+    if match:
+        return match.group(1).strip()
+    
+    return None
+
+
+FONTE_RECURSO_PATTERNS = compile_patterns([
+    r'fonte\s*(?:de\s*)?recurso[s]?[:\s]*([^\n]{5,100})',
+    r'recursos?\s*(?:pr[óo]prios?|federais?|estaduais?)',
+])
+
+
+def extract_fonte_recurso(text):
+    """Extrai fonte de recurso"""
+    match = search_first(prepare(text), FONTE_RECURSO_PATTERNS)
+    if match:
+        return match.group(0).strip()
+    
+    return None
+
+
+# Campos que encerram a leitura no modo incremental
+REQUIRED_FIELDS = {
+    'numero_contrato': extract_numero_contrato,
+    'valor': extract_valor,
+    'cnpj_contratado': extract_cnpj,
+    'data_inicio': extract_data_inicio,
+    'data_fim': extract_data_fim,
+}
+
+# Campos que orientam a ordem do OCR no modo por prioridade (PDF_OCR_PRIORITY=1)
+PRIORITY_FIELDS = dict(REQUIRED_FIELDS, data_final_documento=extract_data_final_documento)
+
+
+def extract_fields(text):
+    """Extrai os dados estruturados do texto do contrato"""
+    # Normaliza o texto e prepara as minúsculas uma única vez para todos os campos
+    text = normalize_text(text)
+    doc = prepare(text)
+    
+    return {
+        'numero_contrato': extract_numero_contrato(doc),
+        'objeto': extract_objeto(doc),
+        'contratante': extract_contratante(doc),
+        'contratado': extract_contratado(doc),
+        'cnpj_contratado': extract_cnpj(doc),
+        'valor': extract_valor(doc),
+        'data_inicio': extract_data_inicio(doc),
+        'data_fim': extract_data_fim(doc),
+        'modalidade': extract_modalidade(doc),
+        'status': 'vigente',
+        'tipo_contrato': extract_tipo_contrato(doc),
+        'secretaria': extract_secretaria(doc),
+        'fonte_recurso': extract_fonte_recurso(doc),
+        'previsao_legal': extract_previsao_legal(doc),
+        'data_final_documento': extract_data_final_documento(doc),
+        'observacoes': None,
+        'texto_extraido': text[:5000],  # Primeiros 5000 caracteres
+    }
+
+
+class FullFieldSet(FieldSet):
+    """Conjunto completo; a busca dos campos que faltam roda só os extratores deles"""
+
+    def __init__(self):
+        super().__init__(tuple(REQUIRED_FIELDS), tuple(PRIORITY_FIELDS))
+
+    def extract(self, text):
+        return extract_fields(text)
+
+    def missing(self, text, names=None):
+        doc = prepare(normalize_text(text))
+        return [name for name in names or self.required if PRIORITY_FIELDS[name](doc) is None]
+
+
+FULL_FIELDS = FullFieldSet()
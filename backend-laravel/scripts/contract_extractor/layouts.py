@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+OCR por regiões nos modelos de contrato conhecidos
+
+Nos modelos da CODEMAR os campos procurados ficam sempre nas mesmas áreas:
+número do contrato e partes no cabeçalho da primeira página, o valor logo
+abaixo e os prazos com a data das assinaturas ("Maricá, ...") no fim da
+última página. Com PDF_OCR_REGIONS=1 as páginas escaneadas passam primeiro
+por OCR só nesses recortes, e cada região só é lida se algum dos campos
+dela ainda faltar. O OCR da página inteira fica para quando um campo
+continua ausente depois das regiões (modelo diferente, página deslocada).
+Se algum campo que falta não tem região ao alcance (página fora do
+orçamento do preset), as regiões são dispensadas e o documento vai direto
+para o OCR das páginas inteiras, que leria as mesmas páginas de qualquer
+forma.
+
+As regiões são declaradas em frações da largura e da altura da página; a
+página pode ser contada do fim (-1 = última). Outros modelos podem ser
+declarados em um arquivo JSON (PDF_OCR_LAYOUTS), tentados antes do padrão:
+
+    [{"name": "aditivo", "regions": [
+        {"name": "cabecalho", "page": 0, "rect": [0, 0, 1, 0.3],
+         "fields": ["numero_contrato", "cnpj_contratado"]}
+    ]}]
+"""
+
+import os
+import json
+
+import fitz  # PyMuPDF
+
+from .ocr_engine import DEFAULT_LANG, ocr_pixmap, render_gray
+from .preprocess import PREPROCESS_ENABLED, ocr_pixmap_preprocessed
+from .stage_timer import count, page_scope
+
+
+# Ativa o OCR por regiões antes do OCR da página inteira
+REGIONS_ENABLED = os.environ.get('PDF_OCR_REGIONS', '0') == '1'
+
+# Arquivo JSON com modelos adicionais, tentados antes do padrão da CODEMAR
+LAYOUTS_FILE = os.environ.get('PDF_OCR_LAYOUTS', '')
+
+
+class Region:
+    """Área de uma página do modelo e os campos que costumam estar nela"""
+
+    def __init__(self, name, page, rect, fields):
+        self.name = name
+        self.page = page
+        self.rect = tuple(float(v) for v in rect)
+        self.fields = tuple(fields)
+
+    def page_num(self, page_count):
+        """Página da região no documento (negativas contam do fim), ou None se não existir"""
+        page_num = self.page if self.page >= 0 else page_count + self.page
+        return page_num if 0 <= page_num < page_count else None
+
+    def clip(self, page):
+        """Retângulo da região em pontos, nas coordenadas da página"""
+        x0, y0, x1, y1 = self.rect
+        rect = page.rect
+        return fitz.Rect(
+            rect.x0 + rect.width * x0, rect.y0 + rect.height * y0,
+            rect.x0 + rect.width * x1, rect.y0 + rect.height * y1,
+        )
+
+    def as_dict(self):
+        return {'name': self.name, 'page': self.page, 'rect': list(self.rect), 'fields': list(self.fields)}
+
+
+class Layout:
+    """Modelo de contrato: regiões lidas na ordem declarada"""
+
+    def __init__(self, name, regions):
+        self.name = name
+        self.regions = list(regions)
+
+    def as_dict(self):
+        return {'name': self.name, 'regions': [region.as_dict() for region in self.regions]}
+
+
+# Modelo padrão da CODEMAR; as regiões vizinhas se sobrepõem para não cortar linhas ao meio
+CODEMAR_LAYOUT = Layout('codemar', [
+    Region('cabecalho', 0, (0.0, 0.0, 1.0, 0.22), ('numero_contrato', 'cnpj_contratado')),
+    Region('valor', 0, (0.0, 0.18, 1.0, 0.4), ('valor',)),
+    Region('assinatura', -1, (0.0, 0.55, 1.0, 1.0), ('data_inicio', 'data_fim', 'data_final_documento')),
+])
+
+
+def load_layouts(path=LAYOUTS_FILE):
+    """Modelos do arquivo JSON seguidos do modelo padrão"""
+    layouts = []
+    if path:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for entry in json.load(f):
+                    regions = [
+                        Region(region['name'], int(region.get('page', 0)), region['rect'], region['fields'])
+                        for region in entry['regions']
+                    ]
+                    layouts.append(Layout(entry['name'], regions))
+        except (OSError, ValueError, KeyError, TypeError):
+            # Arquivo ilegível não impede a extração: fica só o modelo padrão
+            layouts = []
+    layouts.append(CODEMAR_LAYOUT)
+    return layouts
+
+
+LAYOUTS = load_layouts() if REGIONS_ENABLED else [CODEMAR_LAYOUT]
+
+# Configuração dos modelos (faz parte da chave dos caches)
+LAYOUT_SETTINGS = [layout.as_dict() for layout in LAYOUTS]
+
+
+def ocr_region(page, region, zoom, lang=None, config=''):
+    """Renderiza só a região da página e aplica OCR"""
+    pix = render_gray(page, zoom, clip=region.clip(page))
+    if PREPROCESS_ENABLED:
+        return ocr_pixmap_preprocessed(pix, lang, config)
+    return ocr_pixmap(pix, lang, config)
+
+
+def ocr_region_cached(session, page_num, region, preset, region_cache):
+    """Texto OCR da região, reaproveitando o de uma tentativa anterior"""
+    key = f"{page_num}_{region.name}"
+    if region_cache:
+        cached = region_cache.get(key)
+        if cached is not None:
+            return cached
+
+    page = session.page(page_num)
+    try:
+        text = ocr_region(page, region, preset.zoom, preset.lang, preset.ocr_config)
+    except MemoryError:
+        # Orçamento de memória estourado: repetir com outro idioma só pioraria
+        raise
+    except Exception:
+        # Sem os dados do idioma, tenta de novo com o idioma padrão do Tesseract
+        text = ocr_region(page, region, preset.zoom, DEFAULT_LANG, preset.ocr_config)
+
+    if region_cache:
+        region_cache.put(key, text)
+    return text
+
+
+def reachable_fields(page_count, can_ocr, layouts=None):
+    """Campos cobertos por alguma região cuja página existe e pode receber OCR"""
+    fields = set()
+    for layout in layouts or LAYOUTS:
+        for region in layout.regions:
+            page_num = region.page_num(page_count)
+            if page_num is not None and can_ocr(page_num):
+                fields.update(region.fields)
+    return fields
+
+
+def iter_region_texts(session, can_ocr, missing_fields, preset, region_cache=None, deadline=None, layouts=None):
+    """Gera (página, texto da região) das regiões dos modelos cujos campos ainda faltam
+
+    `can_ocr(página)` indica se a página é escaneada e pode receber OCR;
+    `missing_fields()` retorna os campos ainda não encontrados no texto lido
+    até agora. Os modelos são tentados em ordem, até não faltar nenhum campo.
+    """
+    page_count = session.page_count
+    for layout in layouts or LAYOUTS:
+        for region in layout.regions:
+            missing = missing_fields()
+            if not missing:
+                return
+            if not set(region.fields) & set(missing):
+                continue
+
+            page_num = region.page_num(page_count)
+            if page_num is None or not can_ocr(page_num):
+                continue
+            if deadline and not deadline.allows('ocr'):
+                return
+
+            count('regions_ocr')
+            with page_scope(page_num):
+                text = ocr_region_cached(session, page_num, region, preset, region_cache)
+            yield page_num, text
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Modo de baixo consumo de memória para PDFs escaneados muito grandes
+
+Cada página é renderizada em tons de cinza e, quando passaria do limite de
+pixels, em faixas horizontais que vão para o OCR uma de cada vez. Os
+buffers da página e o cache interno do MuPDF são liberados antes da
+próxima página, e a memória residente do processo (lida em
+/proc/self/statm) é comparada com o orçamento configurado antes de cada
+renderização.
+"""
+
+import os
+import gc
+
+import fitz  # PyMuPDF
+
+from .ocr_engine import ocr_pixmap
+from .stage_timer import current_rss, stage
+
+
+# Ativa o modo de baixo consumo de memória
+LOW_MEMORY_ENABLED = os.environ.get('PDF_LOW_MEMORY', '0') == '1'
+
+# Memória residente máxima por processo (0 = sem limite)
+RSS_BUDGET_BYTES = int(os.environ.get('PDF_RSS_BUDGET_MB', '1024')) * 1024 * 1024
+
+# Pixels por faixa; páginas maiores são divididas
+STRIP_MAX_PIXELS = int(os.environ.get('PDF_STRIP_MAX_PIXELS', str(4 * 1000 * 1000)))
+
+# Sobreposição entre faixas (em pontos) para não cortar linhas de texto ao meio
+STRIP_OVERLAP = 24
+
+# Memória estimada por pixel durante o OCR (imagem em cinza mais as cópias internas do Tesseract)
+BYTES_PER_PIXEL = 4
+
+# Menor faixa que ainda vale a pena processar
+MIN_STRIP_PIXELS = 250 * 1000
+
+# Configuração que entra na chave do cache de páginas
+LOW_MEMORY_SETTINGS = {
+    'strip_max_pixels': STRIP_MAX_PIXELS,
+    'strip_overlap': STRIP_OVERLAP,
+}
+
+
+def release_buffers():
+    """Libera o cache de renderização do MuPDF e os objetos Python sem referência"""
+    fitz.TOOLS.store_shrink(100)
+    gc.collect()
+
+
+def available_pixels():
+    """Pixels que cabem no orçamento de memória, liberando buffers se necessário"""
+    if not RSS_BUDGET_BYTES:
+        return STRIP_MAX_PIXELS
+
+    rss = current_rss()
+    if rss is None:
+        return STRIP_MAX_PIXELS
+
+    if rss + STRIP_MAX_PIXELS * BYTES_PER_PIXEL > RSS_BUDGET_BYTES:
+        release_buffers()
+        rss = current_rss()
+
+    headroom = (RSS_BUDGET_BYTES - rss) // BYTES_PER_PIXEL
+    if headroom < MIN_STRIP_PIXELS:
+        raise MemoryError(
+            f"Orçamento de memória excedido: {rss // (1024 * 1024)} MB em uso, "
+            f"limite de {RSS_BUDGET_BYTES // (1024 * 1024)} MB"
+        )
+    return min(STRIP_MAX_PIXELS, headroom)
+
+
+def strip_rects(rect, zoom, max_pixels):
+    """Divide a página em faixas horizontais de no máximo max_pixels quando renderizadas"""
+    width_px = rect.width * zoom
+    height_px = rect.height * zoom
+    if width_px * height_px <= max_pixels:
+        return [rect]
+
+    strip_height = max_pixels / width_px / zoom
+    step = max(strip_height - STRIP_OVERLAP, STRIP_OVERLAP)
+
+    strips = []
+    y0 = rect.y0
+    while y0 < rect.y1:
+        y1 = min(y0 + strip_height, rect.y1)
+        strips.append(fitz.Rect(rect.x0, y0, rect.x1, y1))
+        if y1 >= rect.y1:
+            break
+        y0 += step
+    return strips
+
+
+def _merge_strip_texts(texts):
+    """Junta o texto das faixas, removendo a linha repetida na sobreposição"""
+    lines = []
+    for text in texts:
+        strip_lines = text.splitlines()
+        last = next((line for line in reversed(lines) if line.strip()), None)
+        first = next((i for i, line in enumerate(strip_lines) if line.strip()), None)
+        if last is not None and first is not None and strip_lines[first].strip() == last.strip():
+            strip_lines = strip_lines[first + 1:]
+        lines.extend(strip_lines)
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def ocr_page_low_memory(page, zoom, lang=None, config=''):
+    """Aplica OCR na página faixa por faixa, dentro do orçamento de memória"""
+    matrix = fitz.Matrix(zoom, zoom)
+    texts = []
+
+    for rect in strip_rects(page.rect, zoom, available_pixels()):
+        with stage('render'):
+            pix = page.get_pixmap(matrix=matrix, clip=rect, colorspace=fitz.csGRAY, alpha=False)
+        texts.append(ocr_pixmap(pix, lang, config))
+        # Libera a faixa antes de renderizar a próxima
+        del pix
+
+    release_buffers()
+
+    if len(texts) == 1:
+        return texts[0]
+    return _merge_strip_texts(texts)
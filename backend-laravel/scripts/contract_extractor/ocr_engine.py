@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Motor de OCR que recebe a imagem da página direto do PyMuPDF
+
+A página é renderizada em tons de cinza e os bytes do pixmap são entregues
+ao Tesseract sem passar por PNG. Com o tesserocr instalado o OCR roda no
+próprio processo (sem arquivo temporário nem subprocesso); sem ele, o
+pixmap vira uma imagem PIL sobre o mesmo buffer e segue para o pytesseract.
+
+As instâncias do tesserocr ficam em um pool por processo e são criadas uma
+única vez, então os dados do idioma não são recarregados a cada página. O
+tesserocr libera o GIL durante o reconhecimento, o que permite fazer OCR de
+várias páginas em threads, cada uma com sua instância.
+"""
+
+import os
+import re
+import queue
+import threading
+from contextlib import contextmanager
+
+import fitz  # PyMuPDF
+import pytesseract
+from PIL import Image
+
+from .stage_timer import count, stage
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+
+TESSEROCR_AVAILABLE = tesserocr is not None
+
+# Idioma padrão do Tesseract quando nenhum é informado
+DEFAULT_LANG = 'eng'
+
+# Instâncias do Tesseract mantidas por processo para cada idioma/config
+ENGINE_POOL_SIZE = int(os.environ.get('PDF_OCR_ENGINES', '1'))
+
+_PSM_PATTERN = re.compile(r'--psm\s+(\d+)')
+
+# Pools já criados neste processo, por (idioma, psm)
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _parse_psm(config):
+    """Extrai o modo de segmentação (--psm) da config no formato do pytesseract"""
+    match = _PSM_PATTERN.search(config or '')
+    return int(match.group(1)) if match else None
+
+
+class TesseractPool:
+    """Instâncias do Tesseract já inicializadas, cada uma usada por uma thread de cada vez"""
+
+    def __init__(self, lang, psm, size=1):
+        self.lang = lang
+        self.psm = psm
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _create(self):
+        """Cria uma instância carregando os dados do idioma"""
+        api = tesserocr.PyTessBaseAPI(lang=self.lang)
+        if self.psm is not None:
+            api.SetPageSegMode(self.psm)
+        return api
+
+    def _take(self):
+        """Pega uma instância livre, criando outra enquanto o pool não estiver cheio"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+
+        if not create:
+            return self._idle.get()
+
+        try:
+            return self._create()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    @contextmanager
+    def acquire(self):
+        """Empresta uma instância do pool durante o bloco"""
+        api = self._take()
+        try:
+            yield api
+        finally:
+            self._idle.put(api)
+
+    def grow(self, size):
+        """Aumenta o tamanho máximo do pool"""
+        with self._lock:
+            self.size = max(self.size, size)
+
+    def warm_up(self):
+        """Cria todas as instâncias de uma vez, para o primeiro OCR não pagar a carga do idioma"""
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._create())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+
+def get_pool(lang=None, config='', size=None):
+    """Retorna o pool do processo para o idioma e a config, criando na primeira vez"""
+    key = (lang or DEFAULT_LANG, _parse_psm(config))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = TesseractPool(key[0], key[1], ENGINE_POOL_SIZE)
+            _pools[key] = pool
+    if size:
+        pool.grow(size)
+    return pool
+
+
+def warm_up(lang=None, config='', size=None):
+    """Inicializa as instâncias do Tesseract com antecedência (sem efeito sem o tesserocr)"""
+    if tesserocr is not None:
+        get_pool(lang, config, size).warm_up()
+
+
+def render_gray(page, zoom, clip=None):
+    """Renderiza a página (ou só o retângulo clip) em tons de cinza, sem canal alfa"""
+    with stage('render'):
+        return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False, clip=clip)
+
+
+def pixmap_to_image(pix):
+    """Imagem PIL sobre o buffer do pixmap, sem cópia e sem codificar PNG
+
+    pix.samples devolve uma cópia dos bytes; pix.samples_mv é uma memoryview
+    sobre o próprio buffer, que não mantém o pixmap vivo. Por isso a imagem
+    guarda uma referência ao pixmap enquanto existir.
+    """
+    mode = 'L' if pix.n == 1 else 'RGB'
+    # PyMuPDF antigo não tem samples_mv
+    samples = getattr(pix, 'samples_mv', None)
+    if samples is None:
+        samples = pix.samples
+    image = Image.frombuffer(mode, (pix.width, pix.height), samples, 'raw', mode, pix.stride, 1)
+    image._pixmap = pix
+    return image
+
+
+def _set_image(api, pix):
+    """Entrega os bytes do pixmap à instância do Tesseract"""
+    api.SetImageBytes(pix.samples, pix.width, pix.height, pix.n, pix.stride)
+
+
+def ocr_pixmap(pix, lang=None, config=''):
+    """Aplica OCR em um pixmap e retorna o texto"""
+    count('ocr_pixels', pix.width * pix.height)
+    with stage('ocr'):
+        if tesserocr is not None:
+            with get_pool(lang, config).acquire() as api:
+                _set_image(api, pix)
+                return api.GetUTF8Text()
+
+        return pytesseract.image_to_string(pixmap_to_image(pix), lang=lang, config=config)
+
+
+def ocr_gray(data, width, height, lang=None, config=''):
+    """Aplica OCR em bytes de uma imagem em tons de cinza (um byte por pixel, sem preenchimento)"""
+    count('ocr_pixels', width * height)
+    with stage('ocr'):
+        if tesserocr is not None:
+            with get_pool(lang, config).acquire() as api:
+                api.SetImageBytes(data, width, height, 1, width)
+                return api.GetUTF8Text()
+
+        image = Image.frombuffer('L', (width, height), data, 'raw', 'L', 0, 1)
+        return pytesseract.image_to_string(image, lang=lang, config=config)
+
+
+def ocr_pixmap_with_confidence(pix, lang=None, config=''):
+    """Aplica OCR em um pixmap e retorna (texto, confiança média das palavras)"""
+    count('ocr_pixels', pix.width * pix.height)
+    with stage('ocr'):
+        if tesserocr is not None:
+            with get_pool(lang, config).acquire() as api:
+                _set_image(api, pix)
+                text = api.GetUTF8Text()
+                return text, float(api.MeanTextConf())
+
+        return image_to_data_text(pixmap_to_image(pix), lang, config)
+
+
+def image_to_data_text(image, lang=None, config=''):
+    """OCR pelo image_to_data do pytesseract, remontando o texto por linha"""
+    data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+
+    lines = []
+    current_key = None
+    current_block = None
+    confidences = []
+
+    for i, word in enumerate(data['text']):
+        if not word or not word.strip():
+            continue
+
+        conf = float(data['conf'][i])
+        if conf >= 0:
+            confidences.append(conf)
+
+        block = (data['block_num'][i], data['par_num'][i])
+        key = block + (data['line_num'][i],)
+        if key != current_key:
+            # Parágrafos novos ficam separados por uma linha em branco, como no image_to_string
+            if current_block is not None and block != current_block:
+                lines.append('')
+            lines.append(word)
+            current_key = key
+            current_block = block
+        else:
+            lines[-1] += ' ' + word
+
+    text = '\n'.join(lines) + '\n' if lines else ''
+    confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return text, confidence
+
+
+def ocr_page_image(page, zoom, lang=None, config=''):
+    """Renderiza a página em tons de cinza e aplica OCR"""
+    return ocr_pixmap(render_gray(page, zoom), lang, config)
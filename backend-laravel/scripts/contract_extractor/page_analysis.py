@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Análise de páginas para decidir, página a página, entre camada de texto e OCR
+
+Uma página vai para o OCR quando não tem texto extraível ou quando é
+quase toda ocupada por imagens e tem pouco texto (ex.: anexo escaneado
+com apenas um carimbo ou número de página digital). As demais usam a
+camada de texto do PDF, que é muito mais barata.
+"""
+
+import os
+
+
+# Abaixo deste número de caracteres uma página coberta por imagem é tratada como escaneada
+DENSE_TEXT_CHARS = int(os.environ.get('PDF_DENSE_TEXT_CHARS', '200'))
+
+# Fração da página coberta por imagens a partir da qual ela é considerada escaneada
+IMAGE_COVERAGE_THRESHOLD = float(os.environ.get('PDF_IMAGE_COVERAGE_THRESHOLD', '0.5'))
+
+
+def image_coverage(page):
+    """Fração da área da página coberta por imagens (0.0 a 1.0)"""
+    rect = page.rect
+    page_area = rect.width * rect.height
+    if page_area <= 0:
+        return 0.0
+
+    covered = 0.0
+    for info in page.get_image_info():
+        x0, y0, x1, y1 = info['bbox']
+        # Considera apenas a parte da imagem dentro da página
+        width = min(x1, rect.x1) - max(x0, rect.x0)
+        height = min(y1, rect.y1) - max(y0, rect.y0)
+        if width > 0 and height > 0:
+            covered += width * height
+
+    return min(covered / page_area, 1.0)
+
+
+def page_needs_ocr(page, page_text):
+    """Decide se a página precisa de OCR a partir da densidade de texto e da cobertura por imagens"""
+    chars = len(page_text.strip())
+
+    if chars == 0:
+        return True
+
+    if chars < DENSE_TEXT_CHARS and image_coverage(page) >= IMAGE_COVERAGE_THRESHOLD:
+        return True
+
+    return False
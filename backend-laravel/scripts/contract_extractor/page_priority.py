@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Ordem de OCR pelas páginas com mais chance de conter os campos que faltam
+
+Os extratores leem as páginas em ordem, mas nos contratos da CODEMAR o
+valor (cláusula sexta) e a data das assinaturas ("Maricá, ... de ... de")
+costumam estar longe do início. Com PDF_OCR_PRIORITY=1 é feita uma
+primeira passada barata: a camada de texto de todas as páginas do
+orçamento e, nas escaneadas candidatas, um OCR em miniatura (baixa
+resolução) só para procurar palavras-chave, dispensado quando o orçamento
+de OCR já cobre todas as candidatas. As páginas escaneadas recebem então
+OCR completo na ordem de prioridade para os campos ainda não
+encontrados, até o orçamento de páginas ou até todos os campos aparecerem.
+O limite de candidatas vale só para as miniaturas: as demais páginas
+escaneadas entram depois das candidatas, na ordem do documento.
+"""
+
+import os
+import re
+import time
+
+from .blank_pages import BLANK
+from .ocr_engine import ocr_page_image
+from .stage_timer import count, page_scope, stage
+
+
+# Ativa a ordem de OCR por prioridade
+PRIORITY_ENABLED = os.environ.get('PDF_OCR_PRIORITY', '0') == '1'
+
+# Procura palavras-chave com OCR em miniatura nas páginas escaneadas
+THUMBNAIL_ENABLED = os.environ.get('PDF_OCR_PRIORITY_THUMBNAIL', '1') == '1'
+
+# Zoom da miniatura (0.7 ≈ 50 DPI, cerca de 1/8 dos pixels do OCR a 200 DPI)
+THUMBNAIL_ZOOM = float(os.environ.get('PDF_OCR_PRIORITY_ZOOM', '0.7'))
+
+# Páginas escaneadas com miniatura na primeira passada (as primeiras e sempre a última)
+CANDIDATE_PAGES = int(os.environ.get('PDF_OCR_PRIORITY_PAGES', '20'))
+
+# Configuração do cache de extrações para o modo
+PRIORITY_SETTINGS = {'thumbnail': THUMBNAIL_ENABLED, 'zoom': THUMBNAIL_ZOOM, 'pages': CANDIDATE_PAGES}
+
+# Palavras-chave de cada campo, tolerantes aos erros comuns do OCR em miniatura
+FIELD_KEYWORDS = {
+    'numero_contrato': re.compile(r'contrato\s*n|n[°º]\s*\d'),
+    'cnpj_contratado': re.compile(r'cnpj|\d{2}\.\d{3}\.\d{3}'),
+    'valor': re.compile(r'valor|r\$|cl[áa]usula\s*sexta'),
+    'data_inicio': re.compile(r'in[íi]cio|vig[êe]ncia'),
+    'data_fim': re.compile(r't[ée]rmino|vig[êe]ncia'),
+    'data_final_documento': re.compile(r'maric[áa],'),
+}
+
+# Onde o campo costuma estar quando não há palavra-chave: no início ou no fim do documento
+FIELD_POSITIONS = {
+    'numero_contrato': 'start',
+    'cnpj_contratado': 'start',
+    'data_final_documento': 'end',
+}
+
+# Peso de uma palavra-chave encontrada, frente ao peso 1.0 da posição provável
+KEYWORD_WEIGHT = 2.0
+
+
+def candidate_pages(page_nums, limit=CANDIDATE_PAGES):
+    """Páginas escaneadas candidatas ao OCR: as primeiras e a última"""
+    page_nums = list(page_nums)
+    if len(page_nums) <= limit:
+        return page_nums
+    return page_nums[:limit - 1] + [page_nums[-1]]
+
+
+def spot_keywords(text):
+    """Campos cujas palavras-chave aparecem no texto"""
+    text = text.lower()
+    return {field for field, pattern in FIELD_KEYWORDS.items() if pattern.search(text)}
+
+
+def thumbnail_text(page, lang='por'):
+    """OCR em baixa resolução, suficiente para achar palavras-chave"""
+    with stage('spot'):
+        return ocr_page_image(page, THUMBNAIL_ZOOM, lang=lang, config='--psm 6')
+
+
+def position_score(field, page_num, page_count):
+    """Chance de o campo estar na página só pela posição (1.0 na página provável, 0.5 na vizinha)"""
+    position = FIELD_POSITIONS.get(field)
+    if position is None:
+        return 0.0
+    target = 0 if position == 'start' else page_count - 1
+    distance = abs(page_num - target)
+    return 1.0 if distance == 0 else 0.5 if distance == 1 else 0.0
+
+
+class PageScheduler:
+    """Ordena as páginas escaneadas pelos campos que ainda faltam"""
+
+    def __init__(self, page_count):
+        self.page_count = page_count
+        self.hits = {}
+        self.rest = []
+
+    def add(self, page_num, text=None):
+        """Inclui uma página escaneada, com o texto barato dela se houver"""
+        self.hits[page_num] = spot_keywords(text) if text else set()
+
+    def add_rest(self, page_nums):
+        """Inclui páginas escaneadas fora das candidatas, lidas depois delas na ordem do documento"""
+        self.rest.extend(page_nums)
+
+    def score(self, page_num, missing):
+        """Pontuação da página para os campos que faltam"""
+        hits = self.hits[page_num]
+        return sum(
+            (KEYWORD_WEIGHT if field in hits else 0.0) + position_score(field, page_num, self.page_count)
+            for field in missing
+        )
+
+    def next_page(self, missing):
+        """Retira e retorna a página mais promissora, ou None se não restam páginas ou campos"""
+        if not missing:
+            return None
+        if not self.hits:
+            return self.rest.pop(0) if self.rest else None
+        # Empates ficam com a página anterior
+        page_num = max(self.hits, key=lambda n: (self.score(n, missing), -n))
+        del self.hits[page_num]
+        return page_num
+
+    def __len__(self):
+        return len(self.hits) + len(self.rest)
+
+
+def iter_prioritized_pages(session, ocr, missing_fields, budget=None, page_cache=None, deadline=None, lang='por',
+                           page_nums=None):
+    """Gera (página, texto, 'texto' ou 'ocr'): camada de texto das páginas e depois OCR por prioridade
+
+    `ocr(page_num)` aplica o OCR completo em uma página; `missing_fields(page_texts)`
+    retorna os campos ainda não encontrados no texto lido até agora (em ordem
+    de página). A camada de texto de todas as `page_nums` (padrão: todas) é
+    lida; o limite de candidatas vale só para as escaneadas. O OCR para no
+    orçamento, no prazo ou quando não falta nenhum campo.
+    """
+    if page_nums is None:
+        page_nums = range(session.page_count)
+    scheduler = PageScheduler(session.page_count)
+    texts = {}
+    scanned = []
+
+    for page_num in page_nums:
+        if deadline and not deadline.allows('text'):
+            break
+        started = time.monotonic()
+        with page_scope(page_num):
+            page_text = session.text(page_num)
+
+        if session.needs_ocr(page_num):
+            scanned.append(page_num)
+            continue
+
+        count('pages_text')
+        if deadline:
+            deadline.page_done(page_num, 'text', time.monotonic() - started)
+        texts[page_num] = page_text
+        yield page_num, page_text, 'texto'
+
+    candidates = candidate_pages(scanned)
+    # Se o orçamento cobre todas as candidatas, a ordem não muda quais páginas passam pelo OCR:
+    # as miniaturas custariam mais do que economizam, e a análise de tinta fica para a hora do OCR
+    spot = THUMBNAIL_ENABLED and (budget is None or len(candidates) > budget)
+
+    for page_num in candidates:
+        # Página já processada em uma tentativa anterior dispensa a miniatura
+        cheap_text = page_cache.get(page_num) if page_cache else None
+        if spot and cheap_text is None:
+            # Página em branco não recebe nem a miniatura
+            with page_scope(page_num):
+                blank = session.ink(page_num) == BLANK
+            if blank:
+                count('pages_blank')
+                continue
+            count('pages_spotted')
+            with page_scope(page_num):
+                cheap_text = thumbnail_text(session.page(page_num), lang)
+        scheduler.add(page_num, cheap_text)
+
+    # Sem miniatura nem pontuação, mas ainda com OCR depois das candidatas
+    candidate_set = set(candidates)
+    scheduler.add_rest(page_num for page_num in scanned if page_num not in candidate_set)
+
+    ocr_pages = 0
+    while budget is None or ocr_pages < budget:
+        page_num = scheduler.next_page(missing_fields([texts[n] for n in sorted(texts)]))
+        if page_num is None:
+            break
+        if deadline and not deadline.allows('ocr'):
+            break
+        # Sem a passada das miniaturas, as páginas em branco são descartadas aqui, sem gastar o orçamento
+        with page_scope(page_num):
+            blank = session.ink(page_num) == BLANK
+        if blank:
+            count('pages_blank')
+            continue
+        started = time.monotonic()
+        page_text = ocr(page_num)
+        ocr_pages += 1
+        if deadline:
+            deadline.page_done(page_num, 'ocr', time.monotonic() - started)
+        texts[page_num] = page_text
+        yield page_num, page_text, 'ocr'
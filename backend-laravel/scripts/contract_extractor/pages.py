@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""
+Leitura das páginas do PDF: camada de texto primeiro, OCR só onde precisa
+
+A camada de texto das páginas dentro do orçamento do preset é lida
+primeiro; as páginas escaneadas (page_analysis) passam pelo OCR com a
+renderização do preset, até o orçamento de OCR. O OCR pode ser
+distribuído entre threads (com tesserocr) ou processos, e cada página
+pronta é gravada no cache de páginas para sobreviver ao timeout. Todas as
+etapas usam a mesma sessão do documento (document.py).
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .adaptive_render import ADAPTIVE_ENABLED, adaptive_ocr_page
+from .blank_pages import BLANK, LOW_INK
+from .extraction_cache import open_page_cache
+from .layouts import LAYOUT_SETTINGS, REGIONS_ENABLED, iter_region_texts, reachable_fields
+from .low_memory import LOW_MEMORY_ENABLED, ocr_page_low_memory
+from .ocr_engine import DEFAULT_LANG, TESSEROCR_AVAILABLE, get_pool, ocr_page_image, ocr_pixmap, render_gray, warm_up
+from .page_priority import PRIORITY_ENABLED, iter_prioritized_pages
+from .preprocess import PREPROCESS_ENABLED, ocr_page_preprocessed, ocr_pixmap_preprocessed
+from .stage_timer import collect, collecting, count, merge_page, page_scope, record
+
+
+# Número de threads (com tesserocr) ou processos usados no OCR (1 = serial, no próprio processo)
+OCR_WORKERS = int(os.environ.get('PDF_OCR_WORKERS', '1'))
+
+# Sessão do documento, cache de páginas e preset de cada processo do pool de OCR
+_worker_session = None
+_worker_page_cache = None
+_worker_preset = None
+_worker_measure = False
+
+
+def join_pages(page_texts):
+    """Junta o texto das páginas em um único texto"""
+    return "".join(page_text + "\n" for page_text in page_texts)
+
+
+def ordered_texts(pages):
+    """Textos das páginas ({página: texto}) na ordem do documento"""
+    return [pages[page_num] for page_num in sorted(pages)]
+
+
+def page_budget(default, max_pages):
+    """Orçamento de páginas (None = sem limite), reduzido por max_pages quando informado"""
+    if not max_pages:
+        return default
+    return max_pages if default is None else min(default, max_pages)
+
+
+def _page_range(page_count, budget):
+    """Páginas a processar, respeitando o orçamento de páginas"""
+    return range(page_count if budget is None else min(page_count, budget))
+
+
+def ocr_page(page, preset, lang=None):
+    """Renderiza uma página e aplica OCR com a configuração do preset"""
+    lang = lang or preset.lang
+
+    if ADAPTIVE_ENABLED:
+        return adaptive_ocr_page(page, lang=lang, config=preset.ocr_config)[0]
+
+    if LOW_MEMORY_ENABLED:
+        # Faixas em tons de cinza, com os buffers liberados antes da próxima página
+        return ocr_page_low_memory(page, preset.zoom, lang=lang, config=preset.ocr_config)
+
+    if PREPROCESS_ENABLED:
+        # Binarização, correção da inclinação e recorte das margens antes do Tesseract
+        return ocr_page_preprocessed(page, preset.zoom, lang=lang, config=preset.ocr_config)
+
+    # Entrega o pixmap em tons de cinza ao Tesseract, sem passar por PNG
+    return ocr_page_image(page, preset.zoom, lang=lang, config=preset.ocr_config)
+
+
+def ocr_page_cached(page, page_cache, preset):
+    """Aplica OCR na página, reaproveitando o texto de uma tentativa anterior"""
+    if page_cache:
+        cached = page_cache.get(page.number)
+        if cached is not None:
+            return cached
+
+    try:
+        page_text = ocr_page(page, preset)
+    except MemoryError:
+        # Orçamento de memória estourado: repetir com outro idioma só pioraria
+        raise
+    except Exception:
+        # Sem os dados do idioma, tenta de novo com o idioma padrão do Tesseract
+        page_text = ocr_page(page, preset, lang=DEFAULT_LANG)
+
+    # Grava a página assim que termina, para sobreviver ao timeout
+    if page_cache:
+        page_cache.put(page.number, page_text)
+
+    return page_text
+
+
+def _init_ocr_worker(session, page_cache, preset, measure=False):
+    """Recebe a sessão do documento, aberto uma única vez em cada processo do pool"""
+    global _worker_session, _worker_page_cache, _worker_preset, _worker_measure
+    _worker_session = session
+    _worker_page_cache = page_cache
+    _worker_preset = preset
+    _worker_measure = measure
+    # Cada processo mantém sua instância do Tesseract durante todo o documento
+    warm_up(preset.lang, preset.ocr_config)
+
+
+def _ocr_worker_page(page_num):
+    """Aplica OCR em uma página do documento aberto pelo processo, com as etapas medidas se pedido"""
+    if not _worker_measure:
+        return ocr_page_cached(_worker_session.page(page_num), _worker_page_cache, _worker_preset), None
+
+    with collect() as collector, page_scope(page_num):
+        page_text = ocr_page_cached(_worker_session.page(page_num), _worker_page_cache, _worker_preset)
+    return page_text, collector.page_stages(page_num)
+
+
+def _ocr_pixmap_page(page_num, pix, preset):
+    """Aplica OCR no pixmap de uma página, atribuindo as etapas a ela"""
+    with page_scope(page_num):
+        if PREPROCESS_ENABLED:
+            return ocr_pixmap_preprocessed(pix, preset.lang, preset.ocr_config)
+        return ocr_pixmap(pix, preset.lang, preset.ocr_config)
+
+
+def _finish_ocr_page(page_num, pending, page_cache):
+    """Aguarda o OCR de uma página em thread e grava o texto no cache"""
+    if isinstance(pending, str):
+        return page_num, pending
+
+    page_text = pending.result()
+    if page_cache:
+        page_cache.put(page_num, page_text)
+    return page_num, page_text
+
+
+def _iter_pages_threaded(session, page_nums, page_cache, preset, workers):
+    """OCR em threads com as instâncias do pool; a renderização fica na thread atual"""
+    get_pool(preset.lang, preset.ocr_config, size=workers)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+
+    try:
+        for page_num in page_nums:
+            page_text = page_cache.get(page_num) if page_cache else None
+            if page_text is None:
+                # O PyMuPDF não é thread-safe, então só o OCR vai para as threads
+                with page_scope(page_num):
+                    pix = render_gray(session.page(page_num), preset.zoom)
+                page_text = executor.submit(_ocr_pixmap_page, page_num, pix, preset)
+            pending.append((page_num, page_text))
+
+            # Limita as páginas renderizadas aguardando OCR
+            while len(pending) > workers:
+                yield _finish_ocr_page(*pending.popleft(), page_cache)
+
+        while pending:
+            yield _finish_ocr_page(*pending.popleft(), page_cache)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_pages_with_ocr(session, preset, workers=None, budget=None, page_nums=None):
+    """Gera (página, texto) usando OCR, distribuindo as páginas entre threads ou processos se workers > 1
+
+    `page_nums` pode ser uma lista ou um iterável consumido aos poucos
+    (OcrOrder), conforme as páginas vão para o OCR.
+    """
+    if workers is None:
+        workers = OCR_WORKERS
+
+    if isinstance(page_nums, (list, tuple, range)) and not page_nums:
+        return
+
+    try:
+        page_cache = open_page_cache(session, preset.ocr_settings)
+        if page_nums is None:
+            page_nums = list(_page_range(session.page_count, budget))
+
+        if workers <= 1 or (isinstance(page_nums, (list, tuple, range)) and len(page_nums) <= 1):
+            for page_num in page_nums:
+                with page_scope(page_num):
+                    page_text = ocr_page_cached(session.page(page_num), page_cache, preset)
+                yield page_num, page_text
+        elif TESSEROCR_AVAILABLE and not ADAPTIVE_ENABLED and not LOW_MEMORY_ENABLED:
+            # Com o tesserocr, threads compartilham o documento aberto e cada uma usa sua instância
+            yield from _iter_pages_threaded(session, page_nums, page_cache, preset, workers)
+        else:
+            # Cada processo recebe só a origem da sessão e abre o documento uma vez
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_ocr_worker,
+                initargs=(session, page_cache, preset, collecting()),
+            )
+            pending = deque()
+
+            def finish():
+                page_num, future = pending.popleft()
+                page_text, page_stages = future.result()
+                # Etapas medidas no processo de trabalho entram nas métricas do documento
+                merge_page(page_num, page_stages)
+                return page_num, page_text
+
+            try:
+                # As páginas são enviadas aos poucos e devolvidas na ordem em que foram pedidas
+                for page_num in page_nums:
+                    pending.append((page_num, pool.submit(_ocr_worker_page, page_num)))
+                    while len(pending) > workers:
+                        yield finish()
+                while pending:
+                    yield finish()
+            finally:
+                # Se o consumidor parar antes do fim, as páginas não iniciadas são canceladas
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    except Exception as e:
+        raise Exception(f"Erro no OCR: {str(e)}")
+
+
+def _next_ocr_page(ocr_pages, deadline):
+    """Próxima (página, texto) do OCR, ou None se acabaram as páginas
+
+    O prazo é conferido pela OcrOrder antes de cada página ir para o OCR,
+    quando já se sabe que ela existe e cabe no orçamento: perguntar aqui
+    marcaria como parcial uma extração que leu todo o orçamento.
+    """
+    if deadline is None:
+        return next(ocr_pages, None)
+
+    started = time.monotonic()
+    page = next(ocr_pages, None)
+    if page is not None:
+        deadline.page_done(page[0], 'ocr', time.monotonic() - started)
+    return page
+
+
+class OcrOrder:
+    """Páginas escaneadas na ordem do OCR, classificadas pela tinta só quando consumidas
+
+    As páginas em branco são descartadas e as com pouca tinta (assinaturas,
+    separadores) ficam para o fim, só se sobrar orçamento. Cada página é
+    renderizada para a análise só quando o OCR pede a próxima: a análise
+    para quando o orçamento se completa ou o prazo acaba, e só as páginas
+    de fato examinadas entram em session.blank_pages.
+    """
+
+    def __init__(self, session, page_nums, budget=None, deadline=None):
+        self.session = session
+        self.page_nums = page_nums
+        self.budget = budget
+        self.deadline = deadline
+        self.low_ink = []
+        # Páginas examinadas e tiradas da ordem do documento (em branco ou com pouca tinta)
+        self.skipped = set()
+        # Todas as páginas normais já foram entregues; só restam as com pouca tinta
+        self.classified = False
+
+    def __iter__(self):
+        normal = 0
+        for page_num in self.page_nums:
+            if self.budget is not None and normal >= self.budget:
+                break
+            if self.deadline and not self.deadline.allows('ocr'):
+                break
+            with page_scope(page_num):
+                ink = self.session.ink(page_num)
+            if ink == BLANK:
+                count('pages_blank')
+                self.skipped.add(page_num)
+            elif ink == LOW_INK:
+                self.low_ink.append(page_num)
+                self.skipped.add(page_num)
+            else:
+                normal += 1
+                yield page_num
+
+        self.classified = True
+        if self.deadline and self.deadline.stopped:
+            return
+        for page_num in self.low_ink[:None if self.budget is None else self.budget - normal]:
+            if self.deadline and not self.deadline.allows('ocr'):
+                return
+            yield page_num
+
+
+def iter_ocr_fallback(session, preset, max_pages=None, deadline=None):
+    """Gera (página, texto, 'OCR') aplicando OCR em todas as páginas do orçamento, com ou sem camada de texto"""
+    budget = page_budget(preset.ocr_pages, max_pages)
+    try:
+        page_nums = OcrOrder(session, range(session.page_count), budget, deadline)
+    except Exception:
+        # Sem conseguir abrir o documento, o OCR decide (e informa o erro)
+        page_nums = None
+    ocr_pages = iter_pages_with_ocr(session, preset, budget=budget, page_nums=page_nums)
+    try:
+        while True:
+            page = _next_ocr_page(ocr_pages, deadline)
+            if page is None:
+                break
+            count('pages_ocr')
+            if page[1].strip():
+                yield page[0], page[1], 'OCR'
+    finally:
+        ocr_pages.close()
+
+
+def iter_pages(session, preset, max_pages=None, deadline=None):
+    """Gera (página, texto, método), decidindo página a página entre texto direto e OCR"""
+    if REGIONS_ENABLED:
+        yield from _iter_pages_regions(session, preset, max_pages, deadline)
+        return
+
+    if PRIORITY_ENABLED:
+        yield from _iter_pages_prioritized(session, preset, max_pages, deadline)
+        return
+
+    try:
+        # Lê a camada de texto e separa as páginas que precisam de OCR
+        page_texts = {}
+        ocr_page_nums = []
+
+        record('page_count', session.page_count)
+        if deadline:
+            deadline.page_count = session.page_count
+        for page_num in _page_range(session.page_count, page_budget(preset.text_pages, max_pages)):
+            if deadline and not deadline.allows('text'):
+                break
+            started = time.monotonic()
+            with page_scope(page_num):
+                page_text = session.text(page_num)
+            if session.needs_ocr(page_num):
+                ocr_page_nums.append(page_num)
+            else:
+                page_texts[page_num] = page_text
+                if deadline:
+                    deadline.page_done(page_num, 'text', time.monotonic() - started)
+
+    except Exception:
+        # Se falhou, tenta OCR em todas as páginas
+        yield from iter_ocr_fallback(session, preset, max_pages, deadline)
+        return
+
+    # Só as páginas escaneadas que não estão em branco passam pelo Tesseract, até o orçamento de OCR,
+    # na ordem do documento e com as de pouca tinta (assinaturas, separadores) por último
+    order = OcrOrder(session, ocr_page_nums, page_budget(preset.ocr_pages, max_pages), deadline)
+    ocr_pages = iter_pages_with_ocr(session, preset, page_nums=order)
+    text_nums = deque(sorted(page_texts))
+    scanned = deque(ocr_page_nums)
+    ocr_done = set()
+
+    def text_pages_before_next_ocr():
+        """Páginas com camada de texto anteriores à próxima página escaneada que ainda pode receber OCR"""
+        while scanned and (scanned[0] in ocr_done or scanned[0] in order.skipped):
+            scanned.popleft()
+        limit = None if order.classified or not scanned else scanned[0]
+        while text_nums and (limit is None or text_nums[0] < limit):
+            page_num = text_nums.popleft()
+            count('pages_text')
+            if page_texts[page_num].strip():
+                yield page_num, page_texts[page_num], 'PDF_DIRETO'
+
+    try:
+        while True:
+            yield from text_pages_before_next_ocr()
+            # Sem tempo para mais OCR, as páginas com camada de texto seguintes ainda entram
+            page = None if deadline and deadline.stopped else _next_ocr_page(ocr_pages, deadline)
+            if page is None:
+                break
+            page_num, page_text = page
+            ocr_done.add(page_num)
+            # As de pouca tinta vêm depois de todas as páginas com camada de texto
+            if page_num in order.low_ink:
+                yield from text_pages_before_next_ocr()
+            count('pages_ocr')
+            if page_text.strip():
+                yield page_num, page_text, 'OCR'
+
+        order.classified = True
+        yield from text_pages_before_next_ocr()
+    finally:
+        ocr_pages.close()
+
+
+def _iter_pages_prioritized(session, preset, max_pages, deadline):
+    """Gera (página, texto, método) com o OCR das páginas escaneadas na ordem de prioridade
+
+    As páginas com camada de texto vêm primeiro; depois as escaneadas mais
+    promissoras para os campos que faltam, até o orçamento de OCR ou até
+    todos os campos aparecerem.
+    """
+    record('page_count', session.page_count)
+    if deadline:
+        deadline.page_count = session.page_count
+    page_cache = open_page_cache(session, preset.ocr_settings)
+
+    def ocr(page_num):
+        count('pages_ocr')
+        with page_scope(page_num):
+            return ocr_page_cached(session.page(page_num), page_cache, preset)
+
+    pages = iter_prioritized_pages(
+        session,
+        ocr,
+        lambda page_texts: preset.fields.missing(join_pages(page_texts), preset.fields.priority),
+        page_budget(preset.ocr_pages, max_pages),
+        page_cache,
+        deadline,
+        preset.lang,
+        _page_range(session.page_count, page_budget(preset.text_pages, max_pages)),
+    )
+    for page_num, page_text, kind in pages:
+        if page_text.strip():
+            yield page_num, page_text, 'OCR' if kind == 'ocr' else 'PDF_DIRETO'
+
+
+def _iter_pages_regions(session, preset, max_pages, deadline):
+    """Gera (página, texto, método) com OCR primeiro nas regiões dos modelos conhecidos
+
+    As páginas com camada de texto vêm primeiro. Nas escaneadas, só as
+    regiões (layouts.py) dos campos que faltam passam pelo OCR; as páginas
+    inteiras recebem OCR, na ordem do documento, apenas enquanto algum campo
+    continuar ausente. Uma página lida por inteiro substitui o texto das
+    regiões dela. Cada página é gerada uma única vez: as lidas só pelas
+    regiões saem ao final, com o texto de todas as regiões delas.
+    """
+    record('page_count', session.page_count)
+    if deadline:
+        deadline.page_count = session.page_count
+
+    texts = {}
+    scanned = []
+    for page_num in _page_range(session.page_count, page_budget(preset.text_pages, max_pages)):
+        if deadline and not deadline.allows('text'):
+            break
+        started = time.monotonic()
+        with page_scope(page_num):
+            page_text = session.text(page_num)
+        if session.needs_ocr(page_num):
+            scanned.append(page_num)
+            continue
+
+        count('pages_text')
+        if deadline:
+            deadline.page_done(page_num, 'text', time.monotonic() - started)
+        texts[page_num] = page_text
+        if page_text.strip():
+            yield page_num, page_text, 'PDF_DIRETO'
+
+    def missing_fields():
+        return preset.fields.missing(join_pages(ordered_texts(texts)), preset.fields.priority)
+
+    if not scanned:
+        return
+
+    def can_ocr(page_num):
+        # Só a página da região é analisada; as em branco não recebem OCR
+        if page_num not in scanned:
+            return False
+        with page_scope(page_num):
+            return session.ink(page_num) != BLANK
+
+    # Texto das regiões de cada página ainda não lida por inteiro
+    region_texts = {}
+
+    def region_pages():
+        for page_num in sorted(region_texts):
+            if texts[page_num].strip():
+                yield page_num, texts[page_num], 'OCR'
+
+    # Com um campo sem região ao alcance o OCR das páginas inteiras é certo, e os recortes seriam gasto a mais
+    if set(missing_fields()) <= reachable_fields(session.page_count, can_ocr):
+        region_cache = open_page_cache(session, dict(preset.ocr_settings, regions=LAYOUT_SETTINGS))
+        for page_num, region_text in iter_region_texts(session, can_ocr, missing_fields, preset, region_cache, deadline):
+            # Regiões da mesma página formam o texto dela até um eventual OCR da página inteira
+            region_texts.setdefault(page_num, []).append(region_text)
+            texts[page_num] = '\n'.join(region_texts[page_num])
+
+        if not missing_fields():
+            yield from region_pages()
+            return
+    else:
+        count('regions_skipped')
+
+    count('regions_fallback')
+    order = OcrOrder(session, scanned, page_budget(preset.ocr_pages, max_pages), deadline)
+    ocr_pages = iter_pages_with_ocr(session, preset, page_nums=order)
+    try:
+        while missing_fields():
+            page = _next_ocr_page(ocr_pages, deadline)
+            if page is None:
+                break
+            count('pages_ocr')
+            if page[1].strip():
+                texts[page[0]] = page[1]
+                region_texts.pop(page[0], None)
+                yield page[0], page[1], 'OCR'
+    finally:
+        ocr_pages.close()
+
+    yield from region_pages()
+
+
+def extract_pages(session, preset, early_exit=False, max_pages=None, deadline=None, on_page=None):
+    """Extrai o texto das páginas e retorna (textos na ordem do documento, método)
+
+    No modo incremental para de ler (e de aplicar OCR) quando os campos
+    obrigatórios aparecem. `on_page(página, texto, método)` é chamado a cada
+    página lida, para o modo de streaming.
+    """
+    pages = {}
+    methods = set()
+
+    def read(page_iter):
+        try:
+            for page_num, page_text, metodo in page_iter:
+                pages[page_num] = page_text
+                methods.add(metodo)
+                if on_page:
+                    on_page(page_num, page_text, metodo)
+
+                if early_exit and not preset.fields.missing(join_pages(ordered_texts(pages))):
+                    break
+        finally:
+            page_iter.close()
+
+    read(iter_pages(session, preset, max_pages, deadline))
+
+    if 'OCR' not in methods:
+        text = join_pages(ordered_texts(pages)).strip()
+        if preset.ocr_fallback_chars is None or len(text) > preset.ocr_fallback_chars:
+            return ordered_texts(pages), 'PDF_DIRETO'
+
+        # Texto muito curto sem páginas escaneadas: tenta OCR em todas as páginas
+        pages.clear()
+        methods.clear()
+        read(iter_ocr_fallback(session, preset, max_pages, deadline))
+
+    # No modo por prioridade as páginas chegam fora de ordem
+    page_texts = ordered_texts(pages)
+
+    if len(join_pages(page_texts).strip()) <= preset.min_ocr_chars:
+        return [], "OCR falhou - texto insuficiente"
+
+    return page_texts, 'OCR' if methods == {'OCR'} else 'MISTO'
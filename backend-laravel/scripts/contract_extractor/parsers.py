@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Conversão de datas e valores monetários encontrados nos contratos
+
+Os padrões são compilados uma única vez, na importação do módulo: uma
+única expressão reconhece as datas por extenso ("24 de outubro de 2023",
+qualquer mês) e outra as datas numéricas (dd/mm/aaaa, dd-mm-aaaa,
+dd.mm.aaaa, aaaa-mm-dd, aaaa/mm/dd), sem passar pelo strptime. Os
+resultados ficam em um cache limitado, já que os mesmos valores se
+repetem muito nos lotes de documentos.
+"""
+
+import os
+import re
+from datetime import date
+from functools import lru_cache
+
+
+# Entradas mantidas no cache de cada conversor
+PARSE_CACHE_SIZE = int(os.environ.get('PDF_PARSE_CACHE_SIZE', '4096'))
+
+MESES = {
+    'janeiro': 1, 'fevereiro': 2, 'março': 3, 'abril': 4,
+    'maio': 5, 'junho': 6, 'julho': 7, 'agosto': 8,
+    'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12,
+}
+
+# Data por extenso em qualquer ponto do texto (ex.: "Maricá, 24 de outubro de 2023")
+DATA_EXTENSO_PATTERN = re.compile(
+    r'(\d+)\s+de\s+(' + '|'.join(MESES) + r')\s+de\s+(\d{4})',
+    re.IGNORECASE,
+)
+
+# Data numérica ocupando o valor inteiro: dia-mês-ano com o mesmo separador, ou ano-mês-dia
+DATA_NUMERICA_PATTERN = re.compile(
+    r'(\d{1,2})([/.-])(\d{1,2})\2(\d{4})'
+    r'|(\d{4})([/-])(\d{1,2})\6(\d{1,2})'
+)
+
+NAO_NUMERICO_PATTERN = re.compile(r'[^\d,\.]')
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_date(value):
+    """Converte string para data no formato aaaa-mm-dd"""
+    if not value:
+        return None
+
+    value = value.strip()
+
+    # Datas em português (ex: "24 de outubro de 2023")
+    match = DATA_EXTENSO_PATTERN.search(value)
+    if match:
+        dia, mes, ano = match.groups()
+        return f"{ano}-{MESES[mes.lower()]:02d}-{int(dia):02d}"
+
+    match = DATA_NUMERICA_PATTERN.fullmatch(value)
+    if not match:
+        return None
+
+    if match.group(1):
+        dia, _, mes, ano = match.group(1, 2, 3, 4)
+    else:
+        ano, _, mes, dia = match.group(5, 6, 7, 8)
+
+    # Rejeita datas inexistentes (ex.: 31/02/2024)
+    try:
+        return date(int(ano), int(mes), int(dia)).isoformat()
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_decimal(value):
+    """Converte um valor no formato brasileiro (1.234.567,89) para float"""
+    if not value:
+        return None
+
+    # Remove caracteres não numéricos exceto vírgula e ponto
+    value = NAO_NUMERICO_PATTERN.sub('', value)
+
+    if ',' in value and '.' in value:
+        # Formato brasileiro: 1.234.567,89
+        value = value.replace('.', '').replace(',', '.')
+    elif ',' in value:
+        # Apenas vírgula: 1234,56
+        value = value.replace(',', '.')
+
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Pré-processamento vetorizado da imagem antes do OCR
+
+Scans de contratos chegam tortos, com iluminação desigual e margens largas
+com sombras do scanner. Antes do Tesseract, a página renderizada passa por
+NumPy (sem laço por pixel):
+
+- binarização adaptativa (Bradley): cada pixel é comparado com a média da
+  vizinhança, calculada com uma imagem integral, o que resiste a sombras e
+  papel amarelado melhor que um limiar único;
+- correção da inclinação: o ângulo que deixa as linhas de texto mais
+  concentradas na projeção horizontal (histograma das linhas com
+  np.bincount para cada ângulo candidato), corrigido com uma rotação;
+- recorte das margens: a imagem é reduzida às linhas e colunas com tinta.
+
+Cada etapa pode ser desligada. Sem o NumPy instalado o pré-processamento
+fica desligado e o pixmap vai direto para o OCR.
+"""
+
+import os
+
+from PIL import Image
+
+from .ocr_engine import ocr_gray, render_gray
+from .stage_timer import stage
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+NUMPY_AVAILABLE = np is not None
+
+# Ativa o pré-processamento (PDF_OCR_PREPROCESS=1)
+PREPROCESS_ENABLED = os.environ.get('PDF_OCR_PREPROCESS', '0') == '1' and NUMPY_AVAILABLE
+
+# Etapas do pré-processamento (=0 desliga cada uma)
+BINARIZE = os.environ.get('PDF_PREPROCESS_BINARIZE', '1') != '0'
+DESKEW = os.environ.get('PDF_PREPROCESS_DESKEW', '1') != '0'
+CROP = os.environ.get('PDF_PREPROCESS_CROP', '1') != '0'
+
+# Lado da vizinhança da binarização, como fração da largura da página
+WINDOW = float(os.environ.get('PDF_PREPROCESS_WINDOW', '0.0625'))
+
+# Quanto o pixel precisa ser mais escuro que a média da vizinhança para virar tinta
+THRESHOLD = float(os.environ.get('PDF_PREPROCESS_THRESHOLD', '0.15'))
+
+# Maior inclinação procurada e passo entre os ângulos candidatos, em graus
+MAX_SKEW = float(os.environ.get('PDF_PREPROCESS_MAX_SKEW', '5'))
+SKEW_STEP = float(os.environ.get('PDF_PREPROCESS_SKEW_STEP', '0.2'))
+
+# Inclinação abaixo da qual a página não é girada, em graus
+MIN_SKEW = SKEW_STEP / 2
+
+# Pixels com tinta usados na estimativa da inclinação (amostra espaçada acima disso)
+SKEW_SAMPLE = 200 * 1000
+
+# Borda branca mantida em volta do texto depois do recorte, em pixels
+CROP_PADDING = int(os.environ.get('PDF_PREPROCESS_CROP_PADDING', '16'))
+
+# Pixels com tinta para uma linha ou coluna contar no recorte (ignora poeira isolada)
+CROP_MIN_INK = 2
+
+# Configuração do pré-processamento (faz parte da chave dos caches)
+PREPROCESS_SETTINGS = {
+    'binarize': BINARIZE,
+    'deskew': DESKEW,
+    'crop': CROP,
+    'window': WINDOW,
+    'threshold': THRESHOLD,
+    'max_skew': MAX_SKEW,
+    'skew_step': SKEW_STEP,
+    'crop_padding': CROP_PADDING,
+}
+
+# Pesos da luminância (ITU-R BT.601) para pixmaps coloridos
+_LUMA = (0.299, 0.587, 0.114)
+
+
+def to_gray(pix):
+    """Tons de cinza do pixmap como matriz uint8 (altura x largura), convertendo pixmaps coloridos"""
+    samples = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)
+    samples = samples[:, :pix.width * pix.n].reshape(pix.height, pix.width, pix.n)
+    if pix.n == 1:
+        return samples[:, :, 0]
+    return (samples[:, :, :3] @ np.array(_LUMA)).round().astype(np.uint8)
+
+
+def binarize(gray, window=WINDOW, threshold=THRESHOLD):
+    """Máscara de tinta (True = tinta) pela média da vizinhança de cada pixel, com imagem integral"""
+    height, width = gray.shape
+    radius = max(int(width * window) // 2, 1)
+
+    # Imagem integral com uma linha e uma coluna de zeros: soma de qualquer retângulo em 4 leituras
+    integral = np.zeros((height + 1, width + 1), dtype=np.int64)
+    np.cumsum(np.cumsum(gray, axis=0, dtype=np.int64), axis=1, out=integral[1:, 1:])
+
+    rows = np.arange(height)
+    cols = np.arange(width)
+    top, bottom = np.clip(rows - radius, 0, height), np.clip(rows + radius + 1, 0, height)
+    left, right = np.clip(cols - radius, 0, width), np.clip(cols + radius + 1, 0, width)
+
+    sums = (
+        integral[np.ix_(bottom, right)] - integral[np.ix_(top, right)]
+        - integral[np.ix_(bottom, left)] + integral[np.ix_(top, left)]
+    )
+    area = np.outer(bottom - top, right - left)
+
+    # pixel < média * (1 - limiar), sem divisão
+    return gray.astype(np.int64) * area * 100 < sums * int(round((1 - threshold) * 100))
+
+
+def estimate_skew(ink, max_skew=MAX_SKEW, step=SKEW_STEP):
+    """Inclinação do texto em graus (positiva quando as linhas descem para a direita)"""
+    ys, xs = np.nonzero(ink)
+    if ys.size == 0:
+        return 0.0
+    if ys.size > SKEW_SAMPLE:
+        ys, xs = ys[::ys.size // SKEW_SAMPLE + 1], xs[::xs.size // SKEW_SAMPLE + 1]
+
+    angles = np.arange(-max_skew, max_skew + step / 2, step)
+    offset = int(np.ceil(xs.max() * np.tan(np.radians(max_skew)))) + 1
+    best_angle, best_score = 0.0, -1.0
+    for angle in angles:
+        # Linha de base de cada pixel se o texto estivesse inclinado nesse ângulo
+        baselines = np.rint(ys - xs * np.tan(np.radians(angle))).astype(np.int64) + offset
+        profile = np.bincount(baselines)
+        # Linhas alinhadas concentram a tinta em poucos valores: maior soma dos quadrados
+        score = float(np.dot(profile, profile))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return round(best_angle, 2)
+
+
+def rotate(image, angle, resample):
+    """Gira a matriz no sentido que desfaz a inclinação, preenchendo os cantos com branco"""
+    rotated = Image.fromarray(image).rotate(angle, resample=resample, expand=True, fillcolor=255)
+    return np.asarray(rotated)
+
+
+def crop_margins(image, ink, padding=CROP_PADDING):
+    """Recorta a imagem às linhas e colunas com tinta, mantendo uma borda branca"""
+    rows = np.flatnonzero(np.count_nonzero(ink, axis=1) >= CROP_MIN_INK)
+    cols = np.flatnonzero(np.count_nonzero(ink, axis=0) >= CROP_MIN_INK)
+    if rows.size == 0 or cols.size == 0:
+        return image
+
+    height, width = image.shape
+    top, bottom = max(rows[0] - padding, 0), min(rows[-1] + padding + 1, height)
+    left, right = max(cols[0] - padding, 0), min(cols[-1] + padding + 1, width)
+    return image[top:bottom, left:right]
+
+
+def preprocess(gray):
+    """Aplica as etapas ligadas à matriz em tons de cinza e retorna a imagem para o OCR"""
+    with stage('preprocess'):
+        ink = binarize(gray)
+        # Imagem binarizada com texto preto sobre fundo branco, como o Tesseract espera
+        image = np.where(ink, 0, 255).astype(np.uint8) if BINARIZE else gray
+
+        if DESKEW:
+            angle = estimate_skew(ink)
+            if abs(angle) >= MIN_SKEW:
+                image = rotate(image, angle, Image.NEAREST if BINARIZE else Image.BILINEAR)
+                # A máscara acompanha a rotação para o recorte
+                ink = rotate(np.where(ink, 0, 255).astype(np.uint8), angle, Image.NEAREST) < 128
+
+        if CROP:
+            image = crop_margins(image, ink)
+
+        return np.ascontiguousarray(image)
+
+
+def ocr_pixmap_preprocessed(pix, lang=None, config=''):
+    """Pré-processa o pixmap e aplica OCR na imagem resultante"""
+    image = preprocess(to_gray(pix))
+    height, width = image.shape
+    return ocr_gray(image.tobytes(), width, height, lang, config)
+
+
+def ocr_page_preprocessed(page, zoom, lang=None, config=''):
+    """Renderiza a página em tons de cinza, pré-processa e aplica OCR"""
+    return ocr_pixmap_preprocessed(render_gray(page, zoom), lang, config)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Presets de extração: orçamento de páginas, renderização e conjunto de campos
+
+Os scripts pdf_extractor.py, simple_extractor.py e minimal_extractor.py
+são esses presets aplicados ao mesmo pipeline (pages.py / extractor.py).
+"""
+
+from .adaptive_render import ADAPTIVE_ENABLED, ADAPTIVE_SETTINGS
+from .fields import BASIC_FIELDS, MINIMAL_FIELDS
+from .full_fields import FULL_FIELDS
+from .low_memory import LOW_MEMORY_ENABLED, LOW_MEMORY_SETTINGS
+from .preprocess import PREPROCESS_ENABLED, PREPROCESS_SETTINGS
+
+
+# Resultado do preset 'minimal' quando nenhum texto é extraído
+FALHA_OCR_RESULT = {
+    "numero_contrato": None,
+    "objeto": "PDF escaneado - dados não extraídos automaticamente",
+    "contratante": "COMPANHIA DE DESENVOLVIMENTO DE MARICÁ S.A - CODEMAR",
+    "contratado": None,
+    "cnpj_contratado": None,
+    "valor": None,
+    "data_inicio": None,
+    "data_fim": None,
+    "modalidade": None,
+    "status": "vigente",
+    "tipo_contrato": None,
+    "secretaria": "Diretoria de Administração",
+    "fonte_recurso": None,
+    "previsao_legal": None,
+    "data_final_documento": None,
+    "observacoes": "PDF escaneado - requer revisão manual",
+    "texto_extraido": "Não foi possível extrair texto automaticamente",
+    "metodo": "FALHA_OCR",
+}
+
+
+class Preset:
+    """Estratégias de uma extração"""
+
+    def __init__(self, name, fields, zoom, ocr_config='', lang='por', text_pages=None, ocr_pages=None,
+                 ocr_fallback_chars=None, min_ocr_chars=0, empty_result=None, version='2'):
+        # Nome do extrator no cache de extrações e nas métricas
+        self.name = name
+        # Versão do extrator; incrementar invalida o cache de extrações
+        self.version = version
+        self.fields = fields
+        self.zoom = zoom
+        self.ocr_config = ocr_config
+        self.lang = lang
+        # Páginas lidas pela camada de texto e páginas com OCR (None = todas)
+        self.text_pages = text_pages
+        self.ocr_pages = ocr_pages
+        # Sem páginas escaneadas e com até esse número de caracteres, aplica OCR em todas as páginas
+        self.ocr_fallback_chars = ocr_fallback_chars
+        # Texto com OCR até esse número de caracteres conta como falha
+        self.min_ocr_chars = min_ocr_chars
+        # Resultado quando não há texto (None = erro)
+        self.empty_result = empty_result
+
+        # Configuração de renderização e OCR (faz parte da chave do cache de páginas)
+        self.ocr_settings = {'zoom': zoom, 'lang': lang, 'config': ocr_config, 'colorspace': 'gray'}
+        if ADAPTIVE_ENABLED:
+            self.ocr_settings['adaptive'] = ADAPTIVE_SETTINGS
+        elif LOW_MEMORY_ENABLED:
+            self.ocr_settings['low_memory'] = LOW_MEMORY_SETTINGS
+        elif PREPROCESS_ENABLED:
+            self.ocr_settings['preprocess'] = PREPROCESS_SETTINGS
+
+
+PRESETS = {
+    # Todas as páginas, OCR a 2x e o conjunto completo de campos
+    'pdf': Preset('pdf_extractor', FULL_FIELDS, zoom=2.0),
+    # Texto das 10 primeiras páginas, OCR em até 5 delas a 1.5x
+    'simple': Preset(
+        'simple_extractor', BASIC_FIELDS, zoom=1.5, ocr_config='--psm 6',
+        text_pages=10, ocr_pages=5,
+    ),
+    # Até 3 páginas, OCR a 1.2x (resolução baixa para evitar travamento)
+    'minimal': Preset(
+        'minimal_extractor', MINIMAL_FIELDS, zoom=1.2, ocr_config='--psm 6',
+        text_pages=3, ocr_pages=3, ocr_fallback_chars=100, min_ocr_chars=50,
+        empty_result=FALHA_OCR_RESULT,
+    ),
+}
+
+
+def get_preset(preset):
+    """Retorna o preset pelo nome ('pdf', 'simple', 'minimal'), ou o próprio preset"""
+    if isinstance(preset, Preset):
+        return preset
+    try:
+        return PRESETS[preset]
+    except KeyError:
+        raise ValueError(f"Preset desconhecido: {preset}")
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Medição de tempo por etapa da extração
+
+As etapas (abertura do PDF, camada de texto, renderização, OCR, campos)
+são marcadas com `with stage('ocr'):` nos extratores. Sem um coletor
+ativo a marcação não mede nada; dentro de `with collect() as stages:` o
+tempo de parede e de CPU de cada etapa é acumulado, no total e por página
+(a página atual é indicada com `with page_scope(n):`).
+
+O tempo de CPU soma a thread atual e os subprocessos aguardados durante a
+etapa (o binário do tesseract chamado pelo pytesseract).
+
+A memória aparece de duas formas: a residente do processo no início e no
+fim do documento (rss_start_kb, rss_end_kb e a diferença, rss_delta_kb),
+que vale por documento mesmo em um servidor que atende vários, e o pico
+do processo e dos subprocessos desde que foram iniciados
+(process_peak_rss_kb, process_peak_child_rss_kb), que só é o pico do
+documento quando o processo atende um único documento (benchmark.py).
+
+Com PDF_METRICS=1 os extratores incluem a seção `metrics` no JSON. Com
+PDF_METRICS_TRACE=<arquivo> cada etapa concluída é anexada ao arquivo
+como uma linha JSON no momento em que termina, de modo que um processo
+morto pelo timeout ainda deixa registrado até onde chegou.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# Inclui a seção `metrics` no resultado dos extratores
+METRICS_ENABLED = os.environ.get('PDF_METRICS', '0') == '1'
+
+# Arquivo de trace (JSON lines) com as etapas de cada documento
+TRACE_PATH = os.environ.get('PDF_METRICS_TRACE') or None
+
+# Coletor ativo no processo (None = medição desligada)
+_collector = None
+
+# Página em processamento em cada thread
+_local = threading.local()
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _children_cpu():
+    """Tempo de CPU dos subprocessos já encerrados"""
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+def _empty_entry():
+    return {'calls': 0, 'wall_ms': 0.0, 'cpu_ms': 0.0}
+
+
+def _round_entries(entries):
+    return {
+        name: {
+            'calls': entry['calls'],
+            'wall_ms': round(entry['wall_ms'], 1),
+            'cpu_ms': round(entry['cpu_ms'], 1),
+        }
+        for name, entry in entries.items()
+    }
+
+
+def current_rss():
+    """Memória residente do processo em bytes, ou None fora do Linux"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_memory():
+    """Pico de memória residente do processo e dos subprocessos desde o início de cada um, em KB"""
+    if resource is None:
+        return {}
+    # ru_maxrss vem em KB no Linux e nunca diminui: não é o pico de um documento
+    return {
+        'process_peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'process_peak_child_rss_kb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def document_memory(rss_start):
+    """Memória residente no fim do documento e a diferença desde o início, em KB"""
+    rss_end = current_rss()
+    if rss_start is None or rss_end is None:
+        return {}
+    return {
+        'rss_start_kb': rss_start // 1024,
+        'rss_end_kb': rss_end // 1024,
+        'rss_delta_kb': (rss_end - rss_start) // 1024,
+    }
+
+
+class StageCollector:
+    """Acumula chamadas, tempo de parede e tempo de CPU por etapa e por página"""
+
+    def __init__(self, trace=None):
+        self.stages = {}
+        self.pages = {}
+        self.counters = {}
+        self.values = {}
+        self.trace = trace
+        self.started = time.perf_counter()
+        self.rss_start = current_rss()
+        self._lock = threading.Lock()
+
+    def _add_entry(self, entries, name, calls, wall_ms, cpu_ms):
+        entry = entries.setdefault(name, _empty_entry())
+        entry['calls'] += calls
+        entry['wall_ms'] += wall_ms
+        entry['cpu_ms'] += cpu_ms
+
+    def add(self, name, wall, cpu, page=None):
+        """Soma uma execução da etapa"""
+        wall_ms, cpu_ms = wall * 1000, cpu * 1000
+        with self._lock:
+            self._add_entry(self.stages, name, 1, wall_ms, cpu_ms)
+            if page is not None:
+                self._add_entry(self.pages.setdefault(page, {}), name, 1, wall_ms, cpu_ms)
+            if self.trace:
+                self._write_trace({
+                    'event': 'stage',
+                    'stage': name,
+                    'page': page,
+                    'wall_ms': round(wall_ms, 1),
+                    'cpu_ms': round(cpu_ms, 1),
+                    'at_ms': round((time.perf_counter() - self.started) * 1000, 1),
+                })
+
+    def merge_page(self, page, stages):
+        """Incorpora as etapas de uma página medidas em outro processo"""
+        if not stages:
+            return
+        with self._lock:
+            for name, entry in stages.items():
+                self._add_entry(self.stages, name, entry['calls'], entry['wall_ms'], entry['cpu_ms'])
+                self._add_entry(self.pages.setdefault(page, {}), name, entry['calls'], entry['wall_ms'], entry['cpu_ms'])
+
+    def count(self, name, n=1):
+        """Incrementa um contador (ex.: páginas com OCR)"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name, value):
+        """Registra um valor do documento (ex.: número de páginas)"""
+        with self._lock:
+            self.values[name] = value
+
+    def page_stages(self, page):
+        """Etapas medidas para uma página"""
+        with self._lock:
+            return _round_entries(self.pages.get(page, {}))
+
+    def as_dict(self):
+        """Etapas com os tempos arredondados, prontas para JSON"""
+        with self._lock:
+            return _round_entries(self.stages)
+
+    def _write_trace(self, event):
+        try:
+            self.trace.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self.trace.flush()
+        except (OSError, ValueError):
+            # Trace indisponível não deve impedir a extração
+            self.trace = None
+
+    def write_trace(self, event):
+        """Anexa um evento ao trace, se houver"""
+        with self._lock:
+            if self.trace:
+                self._write_trace(event)
+
+    def summary(self, wall, cpu):
+        """Seção `metrics` do resultado"""
+        with self._lock:
+            metrics = dict(self.values)
+            metrics.update(self.counters)
+            metrics['wall_ms'] = round(wall * 1000, 1)
+            metrics['cpu_ms'] = round(cpu * 1000, 1)
+            metrics['stages'] = _round_entries(self.stages)
+            metrics['pages'] = [
+                {'page': page, 'stages': _round_entries(stages)}
+                for page, stages in sorted(self.pages.items())
+            ]
+        metrics.update(document_memory(self.rss_start))
+        metrics.update(peak_memory())
+        return metrics
+
+
+@contextmanager
+def stage(name):
+    """Mede o bloco como uma execução da etapa, se houver coletor ativo"""
+    collector = _collector
+    if collector is None:
+        yield
+        return
+
+    page = getattr(_local, 'page', None)
+    wall = time.perf_counter()
+    cpu = time.thread_time() + _children_cpu()
+    try:
+        yield
+    finally:
+        collector.add(name, time.perf_counter() - wall, time.thread_time() + _children_cpu() - cpu, page)
+
+
+@contextmanager
+def page_scope(page_num):
+    """Atribui as etapas medidas no bloco à página indicada"""
+    previous = getattr(_local, 'page', None)
+    _local.page = page_num
+    try:
+        yield
+    finally:
+        _local.page = previous
+
+
+def collecting():
+    """Indica se há um coletor ativo"""
+    return _collector is not None
+
+
+def count(name, n=1):
+    """Incrementa um contador do coletor ativo"""
+    collector = _collector
+    if collector is not None:
+        collector.count(name, n)
+
+
+def record(name, value):
+    """Registra um valor no coletor ativo"""
+    collector = _collector
+    if collector is not None:
+        collector.record(name, value)
+
+
+def merge_page(page, stages):
+    """Incorpora ao coletor ativo as etapas de uma página medidas em outro processo"""
+    collector = _collector
+    if collector is not None:
+        collector.merge_page(page, stages)
+
+
+@contextmanager
+def collect(trace=None):
+    """Ativa um coletor durante o bloco e o entrega para leitura"""
+    global _collector
+    previous = _collector
+    _collector = StageCollector(trace)
+    try:
+        yield _collector
+    finally:
+        _collector = previous
+
+
+class Measurement:
+    """Resultado de measure_extraction, para anexar as métricas ao resultado"""
+
+    def __init__(self, include):
+        self.include = include
+        self.metrics = None
+
+    def attach(self, data):
+        """Retorna o resultado com a seção `metrics`, sem alterar o dicionário original"""
+        if not self.include or self.metrics is None or not isinstance(data, dict):
+            return data
+        return dict(data, metrics=self.metrics)
+
+
+@contextmanager
+def measure_extraction(extractor, pdf_path, include_metrics=METRICS_ENABLED, trace_path=TRACE_PATH):
+    """Mede a extração de um documento se as métricas ou o trace estiverem ativos"""
+    measurement = Measurement(include_metrics)
+    if not include_metrics and not trace_path:
+        yield measurement
+        return
+
+    trace = None
+    if trace_path:
+        try:
+            trace = open(trace_path, 'a', encoding='utf-8')
+        except OSError:
+            trace = None
+
+    wall = time.perf_counter()
+    cpu = time.process_time() + _children_cpu()
+    try:
+        with collect(trace) as collector:
+            collector.write_trace({
+                'event': 'start',
+                'extractor': extractor,
+                'file': pdf_path,
+                'pid': os.getpid(),
+                'time': time.time(),
+            })
+            yield measurement
+            measurement.metrics = collector.summary(
+                time.perf_counter() - wall,
+                time.process_time() + _children_cpu() - cpu,
+            )
+            collector.write_trace({'event': 'end', 'extractor': extractor, 'file': pdf_path, 'metrics': measurement.metrics})
+    finally:
+        if trace:
+            trace.close()
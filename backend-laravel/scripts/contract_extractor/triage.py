@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Triagem rápida do PDF antes da extração
+
+Lê só os metadados e uma amostra de páginas (a primeira, a última e
+páginas espaçadas entre elas) e classifica o documento como texto,
+escaneado, misto, criptografado ou corrompido, com o número de páginas e
+uma estimativa do custo de OCR no preset indicado, pelos pixels das
+páginas que o preset de fato passaria pelo OCR, no zoom dele. A fila de
+extração usa o resultado para mandar documentos baratos para a fila
+rápida, scans para o pool de OCR e recusar arquivos quebrados sem gastar
+o prazo de 30s.
+"""
+
+import os
+
+from .document import document_session
+from .presets import get_preset
+from .stage_timer import stage
+
+
+# Páginas lidas na amostra (a primeira e a última sempre entram)
+SAMPLE_PAGES = int(os.environ.get('PDF_TRIAGE_SAMPLE_PAGES', '5'))
+
+# Segundos de OCR por megapixel renderizado: o Tesseract cresce com a área da imagem
+# (uma página A4 no zoom 2.0 tem cerca de 4 MP; no zoom 1.2 do preset 'minimal', 0,7 MP)
+OCR_SECONDS_PER_MEGAPIXEL = float(os.environ.get('PDF_TRIAGE_OCR_SECONDS_PER_MP', '1.0'))
+
+# Custo estimado de OCR, em segundos, até o qual o documento vai para a fila rápida:
+# sem OCR ou menos de uma página A4 mesmo no menor zoom, para os scans irem ao pool de OCR
+FAST_LANE_SECONDS = float(os.environ.get('PDF_TRIAGE_FAST_LANE_SECONDS', '0.5'))
+
+TEXTO = 'texto'
+ESCANEADO = 'escaneado'
+MISTO = 'misto'
+CRIPTOGRAFADO = 'criptografado'
+CORROMPIDO = 'corrompido'
+
+FILA_RAPIDA = 'rapida'
+FILA_OCR = 'ocr'
+REJEITADO = 'rejeitado'
+
+
+def sample_pages(page_count, size=SAMPLE_PAGES):
+    """Páginas da amostra: todas se couberem, senão a primeira, a última e espaçadas entre elas"""
+    if page_count <= size:
+        return list(range(page_count))
+    if size <= 1:
+        return [0]
+    return sorted({round(i * (page_count - 1) / (size - 1)) for i in range(size)})
+
+
+def ocr_megapixels(pages, page_area, preset):
+    """Megapixels renderizados para o OCR das páginas, com a área média em pontos² e o zoom do preset"""
+    return pages * page_area * preset.zoom ** 2 / 1e6
+
+
+def ocr_cost(megapixels):
+    """Segundos estimados de OCR para os megapixels renderizados"""
+    return round(megapixels * OCR_SECONDS_PER_MEGAPIXEL, 1)
+
+
+def _rejected(tipo, erro, page_count=0):
+    return {
+        'tipo': tipo,
+        'total_paginas': page_count,
+        'paginas_amostradas': [],
+        'paginas_escaneadas_estimadas': 0,
+        'paginas_ocr_estimadas': 0,
+        'megapixels_ocr_estimados': 0.0,
+        'custo_ocr_estimado': 0.0,
+        'fila': REJEITADO,
+        'erro': erro,
+    }
+
+
+def triage_document(source, preset='pdf', sample_size=SAMPLE_PAGES):
+    """Classifica o documento e estima o OCR necessário no preset, sem extração completa"""
+    preset = get_preset(preset)
+
+    with stage('triage'):
+        try:
+            with document_session(source) as session:
+                if session.needs_pass:
+                    return _rejected(CRIPTOGRAFADO, "PDF protegido por senha", session.page_count)
+
+                page_count = session.page_count
+                if page_count == 0:
+                    return _rejected(CORROMPIDO, "PDF sem páginas")
+
+                sampled = sample_pages(page_count, sample_size)
+                # Área em pontos² de cada página escaneada da amostra, para estimar os pixels do OCR
+                scanned_areas = []
+                for page_num in sampled:
+                    if session.needs_ocr(page_num):
+                        rect = session.page(page_num).rect
+                        scanned_areas.append(rect.width * rect.height)
+        except Exception as e:
+            return _rejected(CORROMPIDO, str(e))
+
+    scanned = len(scanned_areas)
+    if scanned == 0:
+        tipo = TEXTO
+        scanned_pages = 0
+    elif scanned == len(sampled):
+        tipo = ESCANEADO
+        scanned_pages = page_count
+    else:
+        tipo = MISTO
+        # A proporção da amostra vale para o documento, com ao menos uma página de cada tipo
+        scanned_pages = min(max(round(page_count * scanned / len(sampled)), 1), page_count - 1)
+
+    # Só as páginas dentro dos orçamentos do preset passam pelo OCR
+    read_pages = page_count if preset.text_pages is None else min(page_count, preset.text_pages)
+    ocr_pages = round(scanned_pages * read_pages / page_count)
+    if preset.ocr_pages is not None:
+        ocr_pages = min(ocr_pages, preset.ocr_pages)
+
+    megapixels = ocr_megapixels(ocr_pages, sum(scanned_areas) / scanned, preset) if scanned else 0.0
+    cost = ocr_cost(megapixels)
+
+    return {
+        'tipo': tipo,
+        'total_paginas': page_count,
+        'paginas_amostradas': sampled,
+        'paginas_escaneadas_estimadas': scanned_pages,
+        'paginas_ocr_estimadas': ocr_pages,
+        'megapixels_ocr_estimados': round(megapixels, 1),
+        'custo_ocr_estimado': cost,
+        'fila': FILA_RAPIDA if cost <= FAST_LANE_SECONDS else FILA_OCR,
+    }
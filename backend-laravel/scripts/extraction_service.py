@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Serviço assíncrono de extração com fila de jobs
+
+Recebe pedidos de extração em um socket Unix, devolve na hora o
+identificador do job e executa as extrações em um pool de processos com
+limite global de concorrência (padrão: número de núcleos), de modo que
+vários uploads simultâneos nunca rodem mais OCR do que a máquina aguenta.
+O cliente consulta o andamento e busca o resultado depois.
+
+Protocolo JSON lines (mesmo envelope do extractor_server.py):
+    {"id": 1, "command": "submit", "path": "/caminho/contrato.pdf", "extractor": "minimal"}
+        -> {"id": 1, "result": {"job": "<id>", "status": "queued", "position": 0}}
+    {"id": 2, "command": "status", "job": "<id>"}
+        -> {"id": 2, "result": {"job": "<id>", "status": "running", ...}}
+    {"id": 3, "command": "result", "job": "<id>", "wait": 10}
+        -> {"id": 3, "result": {"job": "<id>", "status": "done", "data": {...}}}
+    {"id": 4, "command": "stats"}
+    {"id": 5, "command": "triage", "path": "/caminho/contrato.pdf"}
+O pedido de submit aceita também "metrics" e "deadline", repassados ao
+extrator. Com "wait" o pedido de resultado aguarda até N segundos pelo
+fim do job. Jobs concluídos ficam disponíveis por PDF_SERVICE_JOB_TTL
+segundos.
+
+Cada job passa antes por uma triagem de milissegundos (metadados e
+amostra de páginas): arquivos criptografados ou corrompidos falham na
+hora, sem ocupar o pool; documentos com pouco OCR estimado vão para a
+fila rápida, com processos próprios tirados do mesmo limite de núcleos, e
+não esperam atrás dos scans. Se um processo morre (ex.: falta de
+memória), todos os jobs em andamento no pool dele falham juntos: cada um é
+repetido uma vez em um processo só dele, e só o que derrubar esse processo
+também é informado como erro.
+
+Uso:
+    python extraction_service.py --socket /tmp/extracao.sock [--workers 4] [--fast-workers 1]
+"""
+
+import sys
+import json
+import os
+import time
+import uuid
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import extractor_server
+from contract_extractor import pages
+from contract_extractor.triage import FILA_OCR, FILA_RAPIDA, REJEITADO
+from extractor_server import DEFAULT_EXTRACTOR, EXTRACTORS, run_extraction, run_triage
+
+
+# Extrações simultâneas, somando as duas filas (padrão: um processo por núcleo)
+SERVICE_WORKERS = int(os.environ.get('PDF_SERVICE_WORKERS', '0')) or os.cpu_count() or 1
+
+# Processos da fila rápida (documentos com pouco ou nenhum OCR), tirados do total acima
+FAST_WORKERS = int(os.environ.get('PDF_SERVICE_FAST_WORKERS', '1'))
+
+# Triagem antes da extração (0 = todos os jobs vão para o pool de OCR)
+TRIAGE_ENABLED = os.environ.get('PDF_SERVICE_TRIAGE', '1') != '0'
+
+# Jobs aguardando execução além dos quais novos pedidos são recusados
+MAX_PENDING = int(os.environ.get('PDF_SERVICE_MAX_PENDING', '100'))
+
+# Tempo, em segundos, que um job concluído fica disponível para consulta
+JOB_TTL = int(os.environ.get('PDF_SERVICE_JOB_TTL', '3600'))
+
+# Espera máxima aceita no pedido de resultado
+MAX_WAIT = 60
+
+
+def _init_worker():
+    """Prepara um processo do pool: Tesseract aquecido e OCR serial dentro do job"""
+    # A concorrência é controlada pelo serviço; um pool de OCR por job multiplicaria os processos
+    pages.OCR_WORKERS = 1
+    extractor_server.warm_up()
+
+
+class Job:
+    """Pedido de extração e seu andamento"""
+
+    def __init__(self, path, extractor, metrics=None, deadline=None):
+        self.id = uuid.uuid4().hex
+        self.path = path
+        self.extractor = extractor
+        self.metrics = metrics
+        self.deadline = deadline
+        self.status = 'queued'
+        # Fila (rápida ou OCR) definida pela triagem
+        self.lane = None
+        self.triage = None
+        # Repetido em um processo isolado depois de um processo do pool morrer
+        self.retried = False
+        self.result = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = asyncio.Event()
+
+    def describe(self):
+        """Andamento do job, sem o resultado"""
+        return {
+            'job': self.id,
+            'status': self.status,
+            'extractor': self.extractor,
+            'lane': self.lane,
+            'triage': self.triage,
+            'retried': self.retried,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class ExtractionService:
+    """Fila de jobs executados em pools de processos (rápido e OCR) com concorrência limitada"""
+
+    def __init__(self, workers=SERVICE_WORKERS, max_pending=MAX_PENDING, job_ttl=JOB_TTL,
+                 fast_workers=FAST_WORKERS, triage_enabled=TRIAGE_ENABLED):
+        if triage_enabled and workers > 1:
+            if not 1 <= fast_workers < workers:
+                raise ValueError(f"A fila rápida precisa de 1 a {workers - 1} processos, tirados dos {workers}")
+            # A fila rápida sai do mesmo orçamento de núcleos, para nunca rodar mais OCR que núcleos
+            self.workers = {FILA_OCR: workers - fast_workers, FILA_RAPIDA: fast_workers}
+        else:
+            # Com um único processo não sobra núcleo para a fila rápida: todos os jobs vão para a de OCR
+            self.workers = {FILA_OCR: workers}
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.triage_enabled = triage_enabled
+        self.jobs = {}
+        self.queued = []
+        # O loop guarda só referências fracas às tasks: sem estas, um job pode ser coletado no meio
+        self._tasks = set()
+        self.running = {lane: 0 for lane in self.workers}
+        self.pools = {lane: self._new_pool(lane) for lane in self.workers}
+        self.slots = {lane: asyncio.Semaphore(size) for lane, size in self.workers.items()}
+        # O PyMuPDF não é thread-safe: as triagens rodam uma por vez, fora do loop
+        self.triage_executor = ThreadPoolExecutor(max_workers=1)
+
+    def _new_pool(self, lane):
+        return ProcessPoolExecutor(max_workers=self.workers[lane], initializer=_init_worker)
+
+    def prune(self):
+        """Remove os jobs concluídos há mais tempo que o TTL"""
+        limit = time.time() - self.job_ttl
+        expired = [job_id for job_id, job in self.jobs.items() if job.finished_at and job.finished_at < limit]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def submit(self, path, extractor=DEFAULT_EXTRACTOR, metrics=None, deadline=None):
+        """Enfileira uma extração e retorna o job"""
+        if extractor not in EXTRACTORS:
+            raise ValueError(f"Extrator desconhecido: {extractor}")
+        if not path or not os.path.exists(path):
+            raise ValueError(f"Arquivo não encontrado: {path}")
+        if len(self.queued) >= self.max_pending:
+            raise ValueError(f"Fila cheia ({self.max_pending} jobs aguardando)")
+
+        self.prune()
+        job = Job(path, extractor, metrics, deadline)
+        self.jobs[job.id] = job
+        self.queued.append(job)
+        task = asyncio.get_running_loop().create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def triage(self, path, extractor=DEFAULT_EXTRACTOR):
+        """Triagem do arquivo (tipo, páginas, custo de OCR estimado e fila)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.triage_executor, run_triage, path, extractor)
+
+    async def _route(self, job):
+        """Define a fila do job pela triagem; retorna False se o arquivo foi recusado"""
+        if not self.triage_enabled:
+            job.lane = FILA_OCR
+            return True
+
+        try:
+            job.triage = await self.triage(job.path, job.extractor)
+        except Exception as e:
+            job.triage = {"error": str(e)}
+
+        if 'error' in job.triage:
+            # Triagem indisponível não impede a extração
+            job.lane = FILA_OCR
+            return True
+
+        if job.triage['fila'] == REJEITADO:
+            self.queued.remove(job)
+            self._finish(job, {"error": job.triage['erro'], "triagem": job.triage})
+            return False
+
+        job.lane = job.triage['fila'] if job.triage['fila'] in self.workers else FILA_OCR
+        return True
+
+    async def _run(self, job):
+        if not await self._route(job):
+            return
+
+        async with self.slots[job.lane]:
+            self.queued.remove(job)
+            self.running[job.lane] += 1
+            job.status = 'running'
+            job.started_at = time.time()
+            pool = self.pools[job.lane]
+            try:
+                result = await self._execute(pool, job)
+            except BrokenProcessPool:
+                # Os outros jobs do pool quebrado também caem aqui: só o primeiro troca o pool
+                if self.pools[job.lane] is pool:
+                    pool.shutdown(wait=False)
+                    self.pools[job.lane] = self._new_pool(job.lane)
+                # Sem saber qual job derrubou o processo, cada um é repetido sozinho, ainda no seu slot
+                result = await self._run_isolated(job)
+            except Exception as e:
+                result = {"error": str(e)}
+            finally:
+                self.running[job.lane] -= 1
+
+        self._finish(job, result)
+
+    async def _execute(self, pool, job):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            pool, run_extraction, job.path, job.extractor, job.metrics, job.deadline,
+        )
+
+    async def _run_isolated(self, job):
+        """Repete o job em um processo só dele; se esse processo também morrer, o culpado é o job"""
+        job.retried = True
+        pool = ProcessPoolExecutor(max_workers=1, initializer=_init_worker)
+        try:
+            return await self._execute(pool, job)
+        except BrokenProcessPool:
+            return {"error": "Processo de extração encerrado inesperadamente"}
+        except Exception as e:
+            return {"error": str(e)}
+        finally:
+            pool.shutdown(wait=False)
+
+    def _finish(self, job, result):
+        job.result = result
+        job.status = 'failed' if isinstance(result, dict) and 'error' in result else 'done'
+        job.finished_at = time.time()
+        job.done.set()
+
+    def get(self, job_id):
+        """Retorna o job indicado"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"Job não encontrado: {job_id}")
+        return job
+
+    def status(self, job_id):
+        """Andamento do job; enquanto aguarda, inclui a posição na fila"""
+        job = self.get(job_id)
+        status = job.describe()
+        if job.status == 'queued':
+            # Posição entre os jobs da mesma fila (os ainda em triagem contam juntos)
+            status['position'] = [queued.lane for queued in self.queued[:self.queued.index(job)]].count(job.lane)
+        return status
+
+    async def result(self, job_id, wait=0):
+        """Andamento do job com o resultado, aguardando até `wait` segundos pelo fim"""
+        job = self.get(job_id)
+        if wait and not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), min(float(wait), MAX_WAIT))
+            except asyncio.TimeoutError:
+                pass
+
+        status = self.status(job_id)
+        if job.done.is_set():
+            status['data'] = job.result
+        return status
+
+    def stats(self):
+        """Ocupação do serviço"""
+        return {
+            'workers': sum(self.workers.values()),
+            'running': sum(self.running.values()),
+            'queued': len(self.queued),
+            'jobs': len(self.jobs),
+            'lanes': {
+                lane: {
+                    'workers': self.workers[lane],
+                    'running': self.running[lane],
+                    'queued': sum(1 for job in self.queued if job.lane == lane),
+                }
+                for lane in self.workers
+            },
+        }
+
+    async def handle_request(self, request):
+        """Executa um comando do protocolo e retorna o resultado"""
+        command = request.get('command', 'submit')
+
+        if command == 'ping':
+            return 'pong'
+        if command == 'stats':
+            return self.stats()
+        if command == 'submit':
+            job = self.submit(
+                request.get('path'),
+                request.get('extractor', DEFAULT_EXTRACTOR),
+                request.get('metrics'),
+                request.get('deadline'),
+            )
+            return self.status(job.id)
+        if command == 'status':
+            return self.status(request.get('job'))
+        if command == 'triage':
+            return await self.triage(request.get('path'), request.get('extractor', DEFAULT_EXTRACTOR))
+        if command == 'result':
+            return await self.result(request.get('job'), request.get('wait', 0))
+        raise ValueError(f"Comando desconhecido: {command}")
+
+    async def handle_line(self, line):
+        """Processa uma linha do protocolo e retorna a linha de resposta"""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return json.dumps({"id": None, "error": f"Pedido inválido: {e}"})
+
+        if not isinstance(request, dict):
+            return json.dumps({"id": None, "error": "Pedido deve ser um objeto JSON"})
+
+        request_id = request.get('id')
+        try:
+            result = await self.handle_request(request)
+        except (ValueError, TypeError) as e:
+            return json.dumps({"id": request_id, "error": str(e)}, ensure_ascii=False)
+        return json.dumps({"id": request_id, "result": result}, ensure_ascii=False)
+
+    async def handle_connection(self, reader, writer):
+        """Atende uma conexão do socket, um pedido por linha"""
+        try:
+            while True:
+                raw_line = await reader.readline()
+                if not raw_line:
+                    break
+                line = raw_line.decode('utf-8', errors='replace')
+                if not line.strip():
+                    continue
+                writer.write((await self.handle_line(line) + "\n").encode('utf-8'))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.triage_executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(socket_path, workers=SERVICE_WORKERS, fast_workers=FAST_WORKERS):
+    """Atende pedidos no socket Unix até ser interrompido"""
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    service = ExtractionService(workers, fast_workers=fast_workers)
+    server = await asyncio.start_unix_server(service.handle_connection, path=socket_path)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Serviço assíncrono de extração de contratos PDF')
+    parser.add_argument('--socket', required=True, help='Caminho do socket Unix')
+    parser.add_argument('--workers', type=int, default=SERVICE_WORKERS, help='Extrações simultâneas nas duas filas (padrão: núcleos)')
+    parser.add_argument('--fast-workers', type=int, default=FAST_WORKERS, help='Processos da fila rápida, tirados de --workers (sem fila rápida com --workers 1)')
+    args = parser.parse_args()
+
+    if args.workers < 1 or args.fast_workers < 1:
+        print(json.dumps({"error": "--workers e --fast-workers devem ser ao menos 1"}))
+        sys.exit(1)
+    if args.workers > 1 and args.fast_workers >= args.workers:
+        print(json.dumps({"error": "--fast-workers deve ser menor que --workers"}))
+        sys.exit(1)
+
+    try:
+        asyncio.run(serve(args.socket, args.workers, args.fast_workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Servidor persistente para extração de dados de contratos PDF
+
+Mantém PyMuPDF, pytesseract e PIL carregados (e os dados de idioma do
+Tesseract aquecidos) para atender vários pedidos sem reiniciar o
+interpretador a cada arquivo.
+
+Protocolo JSON lines: cada linha recebida é um pedido
+    {"id": 1, "path": "/caminho/contrato.pdf", "extractor": "minimal"}
+(com "metrics": true a resposta inclui a seção de métricas; com
+"deadline": <segundos> a extração devolve um resultado parcial ao se
+aproximar do prazo)
+e cada linha enviada é a resposta correspondente
+    {"id": 1, "result": {...}}
+Com "command": "triage" o pedido só classifica o documento (texto,
+escaneado, misto, criptografado, corrompido) e estima o custo de OCR.
+
+No socket, cada conexão é atendida em uma thread e as extrações rodam em
+um pool de PDF_SERVER_WORKERS processos. O tempo que o pedido espera na
+fila sai do "deadline"; se o prazo acabar antes de a extração começar, a
+resposta é {"id": ..., "error": ..., "busy": true}, para o cliente usar
+outro caminho em vez de esperar.
+
+Uso:
+    python extractor_server.py                          # stdin/stdout
+    python extractor_server.py --socket /tmp/extrator.sock [--workers 4]
+"""
+
+import sys
+import json
+import os
+import time
+import argparse
+import threading
+import socketserver
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import fitz  # PyMuPDF
+    import pytesseract
+    from PIL import Image
+except ImportError as e:
+    print(json.dumps({"error": f"Dependência não encontrada: {e}"}))
+    sys.exit(1)
+
+from contract_extractor import PRESETS, extract_contract_data, triage_document
+from contract_extractor import ocr_engine, pages
+
+
+# Um extrator por preset ('pdf', 'simple', 'minimal'), todos no mesmo pipeline
+EXTRACTORS = {name: partial(extract_contract_data, preset=name) for name in PRESETS}
+
+DEFAULT_EXTRACTOR = 'minimal'
+
+# Extrações simultâneas no modo socket (padrão: um processo por núcleo)
+SERVER_WORKERS = int(os.environ.get('PDF_SERVER_WORKERS', '0')) or os.cpu_count() or 1
+
+
+class ServerBusy(Exception):
+    """O prazo do pedido acabou enquanto ele esperava na fila"""
+
+
+def warm_up():
+    """Aquece o Tesseract para que o primeiro pedido não pague a carga inicial"""
+    try:
+        pytesseract.get_tesseract_version()
+        if ocr_engine.TESSEROCR_AVAILABLE:
+            # Instâncias do Tesseract criadas agora ficam prontas para todos os pedidos
+            ocr_engine.warm_up('por')
+            ocr_engine.warm_up('por', '--psm 6')
+        else:
+            # Um OCR em imagem vazia carrega os dados do idioma no cache do sistema
+            pytesseract.image_to_string(Image.new('L', (64, 32), 255), lang='por')
+    except Exception:
+        # Falha no aquecimento não impede o servidor de atender pedidos
+        pass
+
+
+def run_extraction(pdf_path, extractor=DEFAULT_EXTRACTOR, metrics=None, deadline=None):
+    """Executa o extrator indicado sobre um arquivo (metrics/deadline None usam o padrão do extrator)"""
+    if extractor not in EXTRACTORS:
+        return {"error": f"Extrator desconhecido: {extractor}"}
+
+    if not pdf_path or not os.path.exists(pdf_path):
+        return {"error": f"Arquivo não encontrado: {pdf_path}"}
+
+    try:
+        options = {}
+        if metrics is not None:
+            options['metrics'] = metrics
+        if deadline is not None:
+            options['deadline'] = deadline
+        return EXTRACTORS[extractor](pdf_path, **options)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def run_triage(pdf_path, extractor=DEFAULT_EXTRACTOR):
+    """Triagem do arquivo com os orçamentos do preset do extrator indicado"""
+    if extractor not in EXTRACTORS:
+        return {"error": f"Extrator desconhecido: {extractor}"}
+
+    if not pdf_path or not os.path.exists(pdf_path):
+        return {"error": f"Arquivo não encontrado: {pdf_path}"}
+
+    return triage_document(pdf_path, extractor)
+
+
+def run_queued_extraction(pdf_path, extractor, metrics, deadline, received_at):
+    """Executa a extração descontando do prazo o tempo que o pedido esperou na fila"""
+    if deadline is not None:
+        # O relógio monotônico é o mesmo para todos os processos da máquina
+        deadline = float(deadline) - (time.monotonic() - received_at)
+        if deadline <= 0:
+            raise ServerBusy("Prazo esgotado aguardando na fila do servidor")
+    return run_extraction(pdf_path, extractor, metrics, deadline)
+
+
+def _run_inline(fn, *args):
+    return fn(*args)
+
+
+def handle_line(line, run=_run_inline, received_at=None):
+    """Processa uma linha do protocolo e retorna a linha de resposta
+
+    `run(fn, *args)` executa a triagem e a extração (padrão: no próprio
+    processo); `received_at` é o instante, em time.monotonic(), em que o
+    pedido chegou.
+    """
+    if received_at is None:
+        received_at = time.monotonic()
+
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return json.dumps({"id": None, "error": f"Pedido inválido: {e}"})
+
+    if not isinstance(request, dict):
+        return json.dumps({"id": None, "error": "Pedido deve ser um objeto JSON"})
+
+    request_id = request.get('id')
+
+    if request.get('command') == 'ping':
+        return json.dumps({"id": request_id, "result": "pong"})
+
+    try:
+        if request.get('command') == 'triage':
+            result = run(run_triage, request.get('path'), request.get('extractor', DEFAULT_EXTRACTOR))
+        else:
+            result = run(
+                run_queued_extraction,
+                request.get('path'),
+                request.get('extractor', DEFAULT_EXTRACTOR),
+                request.get('metrics'),
+                request.get('deadline'),
+                received_at,
+            )
+    except ServerBusy as e:
+        return json.dumps({"id": request_id, "error": str(e), "busy": True}, ensure_ascii=False)
+    except (ValueError, TypeError) as e:
+        return json.dumps({"id": request_id, "error": str(e)}, ensure_ascii=False)
+    return json.dumps({"id": request_id, "result": result}, ensure_ascii=False)
+
+
+def serve_stdio():
+    """Atende pedidos lidos do stdin, respondendo no stdout"""
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        sys.stdout.write(handle_line(line) + "\n")
+        sys.stdout.flush()
+
+
+class ExtractionRequestHandler(socketserver.StreamRequestHandler):
+    """Atende uma conexão do socket Unix, um pedido por linha"""
+
+    def handle(self):
+        for raw_line in self.rfile:
+            received_at = time.monotonic()
+            line = raw_line.decode('utf-8', errors='replace')
+            if not line.strip():
+                continue
+            self.wfile.write((handle_line(line, self.server.run, received_at) + "\n").encode('utf-8'))
+            self.wfile.flush()
+
+
+def _init_worker(single_ocr_worker):
+    """Prepara um processo do pool do servidor"""
+    if single_ocr_worker:
+        # Com vários pedidos em paralelo, um pool de OCR por pedido multiplicaria os processos
+        pages.OCR_WORKERS = 1
+    warm_up()
+
+
+class ExtractionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Uma thread por conexão; triagens e extrações em um pool limitado de processos"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, workers=SERVER_WORKERS):
+        self.workers = workers
+        self.pool = self._new_pool()
+        self._pool_lock = threading.Lock()
+        super().__init__(socket_path, ExtractionRequestHandler)
+
+    def _new_pool(self):
+        # O PyMuPDF não é thread-safe: os documentos são abertos só nos processos do pool
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.workers > 1,))
+
+    def run(self, fn, *args):
+        """Executa fn no pool e aguarda o resultado"""
+        pool = self.pool
+        try:
+            return pool.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # Um processo morreu (ex.: falta de memória); os próximos pedidos usam um pool novo
+            with self._pool_lock:
+                if self.pool is pool:
+                    pool.shutdown(wait=False)
+                    self.pool = self._new_pool()
+            return {"error": "Processo de extração encerrado inesperadamente"}
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def serve_socket(socket_path, workers=SERVER_WORKERS):
+    """Atende pedidos em um socket Unix até ser interrompido"""
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    server = ExtractionServer(socket_path, workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Servidor persistente de extração de contratos PDF')
+    parser.add_argument('--socket', help='Caminho do socket Unix (padrão: stdin/stdout)')
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS, help='Extrações simultâneas no socket (padrão: núcleos)')
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        print(json.dumps({"error": "--workers deve ser ao menos 1"}))
+        sys.exit(1)
+
+    if args.socket:
+        # As extrações rodam nos processos do pool, aquecidos um a um
+        serve_socket(args.socket, args.workers)
+    else:
+        warm_up()
+        serve_stdio()
+
+
+if __name__ == "__main__":
+    main()
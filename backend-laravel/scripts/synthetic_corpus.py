@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Corpus sintético de contratos no formato da CODEMAR
+
+Gera contratos em PDF com valores conhecidos, em três variantes: com
+camada de texto, escaneados (cada página vira uma imagem, sem texto
+extraível) e escaneados tortos (a imagem levemente girada, como uma folha
+mal posicionada no scanner), com números de páginas variados. Os valores esperados de cada
+arquivo ficam em ground_truth.json, no formato devolvido pelos extratores.
+
+Uso:
+    python synthetic_corpus.py <diretório> [--pages 1,3,8] [--seed 42]
+"""
+
+import sys
+import json
+import os
+import random
+import argparse
+from datetime import date, timedelta
+
+try:
+    import fitz  # PyMuPDF
+except ImportError as e:
+    print(json.dumps({"error": f"Dependência não encontrada: {e}"}))
+    sys.exit(1)
+
+
+GROUND_TRUTH_FILE = 'ground_truth.json'
+
+# Campos comparados pelo benchmark
+TRUTH_FIELDS = ('numero_contrato', 'cnpj_contratado', 'valor', 'data_inicio', 'data_fim')
+
+# Variantes geradas: camada de texto, página escaneada ou escaneada torta
+KINDS = ('texto', 'escaneado', 'escaneado_torto')
+
+DEFAULT_PAGE_COUNTS = (1, 3, 8)
+
+# Resolução das páginas escaneadas
+SCAN_DPI = 150
+
+# Inclinação das páginas escaneadas tortas, em graus (o sinal alterna entre os contratos)
+SCAN_SKEW = 2.5
+
+EMPRESAS = [
+    'DESTAQ COMÉRCIO E SERVIÇOS LTDA',
+    'MARICÁ ENGENHARIA E CONSTRUÇÕES LTDA',
+    'LITORAL SERVIÇOS DE LIMPEZA EIRELI',
+    'ATLÂNTICA TECNOLOGIA DA INFORMAÇÃO S.A.',
+    'RESTINGA TRANSPORTES E LOGÍSTICA LTDA',
+]
+
+SERVICOS = [
+    'manutenção predial preventiva e corretiva',
+    'limpeza e conservação das instalações',
+    'fornecimento de licenças de software',
+    'locação de veículos com motorista',
+    'execução de obra de pavimentação',
+]
+
+MODALIDADES = ['Pregão Eletrônico', 'Concorrência', 'Dispensa', 'Inexigibilidade']
+
+MESES = [
+    'janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho',
+    'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro',
+]
+
+# Texto das cláusulas sem palavras-chave dos padrões de extração
+CLAUSULA = (
+    "As partes se obrigam a cumprir fielmente as condições estabelecidas neste "
+    "instrumento, respondendo cada uma pelas consequências de sua inexecução total "
+    "ou parcial, observadas as normas internas da Companhia e a legislação aplicável. "
+    "Eventuais alterações serão formalizadas por termo aditivo, mediante justificativa "
+    "prévia da área requisitante e parecer da assessoria jurídica."
+)
+
+FONT_SIZE = 11
+MARGIN = 56
+
+
+def format_brl(value):
+    """Formata um valor no padrão brasileiro (1.234.567,89)"""
+    return f"{value:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def format_cnpj(digits):
+    """Formata 14 dígitos como CNPJ"""
+    return f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:14]}"
+
+
+def make_contract(rng, index):
+    """Sorteia os dados de um contrato e retorna (valores esperados, dados de apoio)"""
+    inicio = date(2023, 1, 1) + timedelta(days=rng.randrange(700))
+    fim = inicio + timedelta(days=rng.choice([180, 365, 730]) - 1)
+    assinatura = inicio - timedelta(days=rng.randrange(1, 15))
+    cnpj = ''.join(str(rng.randrange(10)) for _ in range(8)) + '0001' + f"{rng.randrange(100):02d}"
+
+    truth = {
+        'numero_contrato': f"{index + 1:03d}/{inicio.year}",
+        'cnpj_contratado': format_cnpj(cnpj),
+        'valor': round(rng.uniform(5000, 5000000), 2),
+        'data_inicio': inicio.isoformat(),
+        'data_fim': fim.isoformat(),
+    }
+    extra = {
+        'empresa': rng.choice(EMPRESAS),
+        'servico': rng.choice(SERVICOS),
+        'modalidade': rng.choice(MODALIDADES),
+        'assinatura': f"{assinatura.day} de {MESES[assinatura.month - 1]} de {assinatura.year}",
+    }
+    return truth, extra
+
+
+def contract_pages(truth, extra, page_count):
+    """Texto de cada página do contrato; os prazos ficam na última página"""
+    inicio = date.fromisoformat(truth['data_inicio'])
+    fim = date.fromisoformat(truth['data_fim'])
+
+    cabecalho = (
+        f"CONTRATO Nº {truth['numero_contrato']}\n\n"
+        "CONTRATANTE: COMPANHIA DE DESENVOLVIMENTO DE MARICÁ - CODEMAR\n"
+        f"CONTRATADA: {extra['empresa']} - CNPJ {truth['cnpj_contratado']}\n\n"
+        f"OBJETO: Contratação de empresa para {extra['servico']}, conforme termo de referência.\n\n"
+        f"MODALIDADE: {extra['modalidade']}\n\n"
+        f"VALOR DO CONTRATO: R$ {format_brl(truth['valor'])}\n\n"
+    )
+    prazos = (
+        "PRAZOS\n\n"
+        f"DATA DO INÍCIO: {inicio.strftime('%d/%m/%Y')}\n"
+        f"DATA DE TÉRMINO: {fim.strftime('%d/%m/%Y')}\n\n"
+        f"Maricá, {extra['assinatura']}.\n"
+    )
+
+    pages = []
+    clausula = 1
+    for page_num in range(page_count):
+        parts = [cabecalho] if page_num == 0 else []
+        for _ in range(3 if page_num == 0 else 5):
+            parts.append(f"CLÁUSULA {clausula}\n{CLAUSULA}\n\n")
+            clausula += 1
+        if page_num == page_count - 1:
+            parts.append(prazos)
+        pages.append(''.join(parts))
+    return pages
+
+
+def build_text_pdf(pages, path):
+    """Grava o contrato como PDF com camada de texto"""
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page(width=595, height=842)  # A4
+        rect = fitz.Rect(MARGIN, MARGIN, 595 - MARGIN, 842 - MARGIN)
+        if page.insert_textbox(rect, text, fontsize=FONT_SIZE, fontname='helv') < 0:
+            raise ValueError("Texto da página não coube na área útil")
+    doc.save(path)
+    doc.close()
+
+
+def rasterize_pdf(source_path, path, dpi=SCAN_DPI, skew=0.0):
+    """Grava uma cópia do PDF em que cada página é apenas uma imagem, girada em skew graus"""
+    source = fitz.open(source_path)
+    doc = fitz.open()
+    zoom = dpi / 72
+    matrix = fitz.Matrix(zoom, zoom).prerotate(skew)
+    for source_page in source:
+        # Os cantos que sobram da rotação ficam brancos, como o fundo do scanner
+        pix = source_page.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False)
+        page = doc.new_page(width=source_page.rect.width, height=source_page.rect.height)
+        page.insert_image(page.rect, pixmap=pix)
+    doc.save(path, deflate=True)
+    doc.close()
+    source.close()
+
+
+def generate_corpus(out_dir, page_counts=DEFAULT_PAGE_COUNTS, seed=42):
+    """Gera o corpus no diretório e retorna {arquivo: {'kind', 'pages', 'truth'}}"""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    corpus = {}
+
+    for index, page_count in enumerate(page_counts):
+        truth, extra = make_contract(rng, index)
+        pages = contract_pages(truth, extra, page_count)
+
+        text_name = f"contrato_{page_count:02d}p_texto.pdf"
+        scan_name = f"contrato_{page_count:02d}p_escaneado.pdf"
+        skewed_name = f"contrato_{page_count:02d}p_escaneado_torto.pdf"
+        build_text_pdf(pages, os.path.join(out_dir, text_name))
+        rasterize_pdf(os.path.join(out_dir, text_name), os.path.join(out_dir, scan_name))
+        skew = SCAN_SKEW if index % 2 == 0 else -SCAN_SKEW
+        rasterize_pdf(os.path.join(out_dir, text_name), os.path.join(out_dir, skewed_name), skew=skew)
+
+        corpus[text_name] = {'kind': 'texto', 'pages': page_count, 'truth': truth}
+        corpus[scan_name] = {'kind': 'escaneado', 'pages': page_count, 'truth': truth}
+        corpus[skewed_name] = {'kind': 'escaneado_torto', 'pages': page_count, 'truth': truth}
+
+    with open(os.path.join(out_dir, GROUND_TRUTH_FILE), 'w', encoding='utf-8') as f:
+        json.dump(corpus, f, ensure_ascii=False, indent=2)
+
+    return corpus
+
+
+def load_ground_truth(corpus_dir):
+    """Lê os valores esperados gravados junto com o corpus"""
+    with open(os.path.join(corpus_dir, GROUND_TRUTH_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Gera contratos sintéticos para o benchmark')
+    parser.add_argument('directory', help='Diretório de saída')
+    parser.add_argument('--pages', default=','.join(str(n) for n in DEFAULT_PAGE_COUNTS), help='Números de páginas, separados por vírgula')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    page_counts = [int(n) for n in args.pages.split(',') if n.strip()]
+    corpus = generate_corpus(args.directory, page_counts, args.seed)
+    print(json.dumps({'directory': args.directory, 'files': sorted(corpus)}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
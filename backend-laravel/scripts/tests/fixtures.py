@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+PDFs de teste: o mesmo contrato com camada de texto e escaneado
+
+O OCR dos testes é um stub que devolve o texto da página correspondente
+no PDF com camada de texto, então não precisa do Tesseract.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_corpus import CLAUSULA, build_text_pdf, rasterize_pdf  # noqa: E402
+
+
+# Resolução baixa: as páginas só precisam ser imagens, sem texto extraível
+TEST_DPI = 40
+
+
+def page_text(page_num):
+    """Texto de uma página comum do contrato de teste"""
+    return f"PÁGINA {page_num + 1}\n{CLAUSULA}\n"
+
+
+def make_scanned_contract(out_dir, page_count, blank=(), pages=None, name='contrato'):
+    """Grava o contrato com camada de texto e escaneado; retorna (caminho escaneado, textos das páginas)
+
+    `pages` substitui o texto de algumas páginas ({página: texto}); as de
+    `blank` ficam em branco.
+    """
+    pages = pages or {}
+    texts = [
+        '' if page_num in blank else pages.get(page_num, page_text(page_num))
+        for page_num in range(page_count)
+    ]
+    text_path = os.path.join(out_dir, f"{name}_texto.pdf")
+    scan_path = os.path.join(out_dir, f"{name}_escaneado.pdf")
+    build_text_pdf(texts, text_path)
+    rasterize_pdf(text_path, scan_path, dpi=TEST_DPI)
+    return scan_path, texts
+
+
+def fake_ocr_page(texts, delay=0.0):
+    """Substituto de pages.ocr_page que devolve o texto original da página, levando `delay` segundos"""
+    def ocr_page(page, preset, lang=None):
+        if delay:
+            time.sleep(delay)
+        return texts[page.number]
+    return ocr_page
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Testes da recuperação do lote quando um processo de extração morre
+
+Uso (no diretório scripts):
+    python -m unittest discover -s tests
+"""
+
+import io
+import os
+import sys
+import json
+import unittest
+import multiprocessing
+from unittest import mock
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_extractor  # noqa: E402
+
+
+def _process_or_die(pdf_path, extractor):
+    """Simula um documento que derruba o processo (ex.: falta de memória)"""
+    if 'quebra' in pdf_path:
+        os._exit(1)
+    return {'arquivo': pdf_path}, 0.0
+
+
+@unittest.skipUnless(multiprocessing.get_start_method() == 'fork', 'o processo de trabalho precisa herdar o mock')
+class BrokenPoolTest(unittest.TestCase):
+
+    def run_batch(self, files, workers):
+        output = io.StringIO()
+        with mock.patch.object(batch_extractor, 'process_file', _process_or_die):
+            summary = batch_extractor.run_batch(files, workers=workers, output=output)
+        records = {record['file']: record for record in map(json.loads, output.getvalue().splitlines())}
+        return summary, records
+
+    def test_only_the_culprit_fails(self):
+        files = [f"doc{i}.pdf" for i in range(6)] + ['quebra.pdf'] + [f"doc{i}.pdf" for i in range(6, 10)]
+        summary, records = self.run_batch(files, workers=3)
+
+        self.assertEqual(summary['total'], len(files))
+        self.assertEqual(summary['errors'], 1)
+        self.assertFalse(records['quebra.pdf']['ok'])
+        self.assertTrue(all(records[f"doc{i}.pdf"]['ok'] for i in range(10)))
+
+    def test_two_culprits(self):
+        files = ['quebra1.pdf', 'doc0.pdf', 'quebra2.pdf', 'doc1.pdf']
+        summary, records = self.run_batch(files, workers=2)
+
+        self.assertEqual(summary['errors'], 2)
+        self.assertTrue(records['doc0.pdf']['ok'])
+        self.assertTrue(records['doc1.pdf']['ok'])
+
+
+class _BrokenOnSubmitPool:
+    """Pool que executa na hora; o primeiro pool criado quebra no segundo envio"""
+
+    created = 0
+
+    def __init__(self, max_workers=None):
+        type(self).created += 1
+        self.broken = type(self).created == 1
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        if self.broken and self.submitted == 2:
+            raise BrokenProcessPool('processo morto antes do envio')
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class BrokenOnSubmitTest(unittest.TestCase):
+
+    def test_file_submitted_to_broken_pool_is_not_lost(self):
+        output = io.StringIO()
+        files = ['doc0.pdf', 'doc1.pdf', 'doc2.pdf']
+        with mock.patch.object(batch_extractor, 'process_file', _process_or_die), \
+                mock.patch.object(batch_extractor, 'ProcessPoolExecutor', _BrokenOnSubmitPool):
+            summary = batch_extractor.run_batch(files, workers=2, output=output)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(sorted(record['file'] for record in records), files)
+        self.assertEqual(summary['errors'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
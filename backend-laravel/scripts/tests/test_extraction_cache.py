@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Testes da remoção LRU do cache de extração
+
+Uso (no diretório scripts):
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contract_extractor import extraction_cache  # noqa: E402
+from contract_extractor.extraction_cache import ExtractionCache  # noqa: E402
+
+
+class EvictionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_walks_only_when_counter_crosses_limit(self):
+        cache = ExtractionCache(self.tmp.name, max_bytes=10 * 1024)
+        with mock.patch.object(ExtractionCache, 'evict', autospec=True, side_effect=ExtractionCache.evict) as evict:
+            for i in range(5):
+                cache.put(f"k{i:02d}", ['x' * 100], {})
+        # Só a primeira gravação (sem contador ainda) varre o diretório
+        self.assertEqual(evict.call_count, 1)
+
+    def test_evicts_least_recently_used_over_limit(self):
+        cache = ExtractionCache(self.tmp.name, max_bytes=1000)
+        for i in range(6):
+            cache.put(f"k{i:02d}", ['x' * 300], {})
+            os.utime(cache._entry_path(f"k{i:02d}"), (i, i))
+
+        self.assertIsNone(cache.get('k00'))
+        self.assertIsNotNone(cache.get('k05'))
+        self.assertLessEqual(cache._read_usage()['bytes'], 1000)
+
+    def test_periodic_walk_counts_page_texts(self):
+        cache = ExtractionCache(self.tmp.name, max_bytes=10 * 1024)
+        with mock.patch.object(extraction_cache, 'EVICT_EVERY', 2):
+            cache.put('k00', [], {})
+            # Texto por página gravado fora do contador
+            pages_dir = os.path.join(self.tmp.name, 'pages')
+            os.makedirs(pages_dir)
+            with open(os.path.join(pages_dir, '0.txt'), 'w') as f:
+                f.write('y' * 4000)
+            cache.put('k01', [], {})
+            cache.put('k02', [], {})
+
+        self.assertGreaterEqual(cache._read_usage()['bytes'], 4000)
+
+
+if __name__ == '__main__':
+    unittest.main()
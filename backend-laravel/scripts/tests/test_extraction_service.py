@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Testes da fila de jobs do serviço de extração
+
+Uso (no diretório scripts):
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import unittest
+import multiprocessing
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extraction_service  # noqa: E402
+from extraction_service import ExtractionService  # noqa: E402
+from contract_extractor.triage import FILA_OCR, FILA_RAPIDA  # noqa: E402
+
+
+def _extract_or_die(path, extractor, metrics=None, deadline=None):
+    """Simula a extração; arquivos 'quebra' derrubam o processo (ex.: falta de memória)"""
+    if 'quebra' in path:
+        os._exit(1)
+    # Mantém o job em andamento enquanto o outro derruba o pool
+    time.sleep(0.3)
+    return {'arquivo': os.path.basename(path), 'pid': os.getpid()}
+
+
+@unittest.skipUnless(multiprocessing.get_start_method() == 'fork', 'o processo de trabalho precisa herdar o mock')
+class ServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(extraction_service, 'run_extraction', _extract_or_die)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Sem aquecer o Tesseract nos processos do pool
+        patcher = mock.patch.object(extraction_service.extractor_server, 'warm_up', lambda: None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def path(self, name):
+        path = os.path.join(self.tmp.name, name)
+        open(path, 'wb').close()
+        return path
+
+    def run_jobs(self, names, **options):
+        async def run():
+            service = ExtractionService(triage_enabled=False, **options)
+            try:
+                jobs = [service.submit(self.path(name)) for name in names]
+                await asyncio.wait_for(asyncio.gather(*(job.done.wait() for job in jobs)), 30)
+                self.assertEqual(service._tasks, set())
+                return {name: job for name, job in zip(names, jobs)}
+            finally:
+                service.close()
+        return asyncio.run(run())
+
+    def test_jobs_finish(self):
+        jobs = self.run_jobs(['a.pdf', 'b.pdf', 'c.pdf'], workers=2)
+        self.assertTrue(all(job.status == 'done' for job in jobs.values()))
+
+    def test_only_the_culprit_fails_when_pool_breaks(self):
+        jobs = self.run_jobs(['a.pdf', 'quebra.pdf', 'b.pdf'], workers=3)
+        self.assertEqual(jobs['quebra.pdf'].status, 'failed')
+        self.assertTrue(jobs['quebra.pdf'].retried)
+        # Os outros jobs estavam no pool quando ele quebrou e terminam na repetição
+        for name in ('a.pdf', 'b.pdf'):
+            self.assertTrue(jobs[name].retried)
+            self.assertEqual(jobs[name].status, 'done')
+
+    def test_next_jobs_use_new_pool(self):
+        async def run():
+            service = ExtractionService(workers=2, triage_enabled=False)
+            try:
+                first = service.submit(self.path('quebra.pdf'))
+                await asyncio.wait_for(first.done.wait(), 30)
+                second = service.submit(self.path('a.pdf'))
+                await asyncio.wait_for(second.done.wait(), 30)
+                return second
+            finally:
+                service.close()
+        second = asyncio.run(run())
+        self.assertEqual(second.status, 'done')
+        self.assertFalse(second.retried)
+
+
+class WorkerBudgetTest(unittest.TestCase):
+
+    def make_service(self, workers, fast_workers=1):
+        async def make():
+            service = ExtractionService(workers, fast_workers=fast_workers, triage_enabled=True)
+            service.close()
+            return service
+        return asyncio.run(make())
+
+    def test_fast_lane_comes_out_of_workers(self):
+        service = self.make_service(4)
+        self.assertEqual(service.workers, {FILA_OCR: 3, FILA_RAPIDA: 1})
+
+    def test_single_worker_has_no_fast_lane(self):
+        service = self.make_service(1)
+        self.assertEqual(service.workers, {FILA_OCR: 1})
+
+    def test_fast_lane_must_leave_a_core_for_ocr(self):
+        with self.assertRaises(ValueError):
+            self.make_service(2, fast_workers=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
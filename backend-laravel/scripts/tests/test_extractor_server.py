@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Testes do servidor persistente no socket Unix
+
+Uso (no diretório scripts):
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import threading
+import unittest
+import multiprocessing
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extractor_server  # noqa: E402
+from extractor_server import ExtractionServer  # noqa: E402
+
+
+# Duração da extração simulada, em segundos
+EXTRACTION_SECONDS = 0.5
+
+
+def _slow_extraction(path, extractor, metrics=None, deadline=None):
+    """Simula uma extração e devolve o prazo que ela recebeu"""
+    time.sleep(EXTRACTION_SECONDS)
+    return {'arquivo': os.path.basename(path), 'deadline': deadline}
+
+
+@unittest.skipUnless(multiprocessing.get_start_method() == 'fork', 'o processo de trabalho precisa herdar o mock')
+class SocketServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.pdf = os.path.join(self.tmp.name, 'contrato.pdf')
+        open(self.pdf, 'wb').close()
+        for name, value in (('run_extraction', _slow_extraction), ('warm_up', lambda: None)):
+            patcher = mock.patch.object(extractor_server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def start_server(self, workers):
+        socket_path = os.path.join(self.tmp.name, 'extrator.sock')
+        server = ExtractionServer(socket_path, workers)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+        self.addCleanup(stop)
+        return socket_path
+
+    def request_all(self, socket_path, requests):
+        """Envia cada pedido em uma conexão própria, todos ao mesmo tempo"""
+        responses = [None] * len(requests)
+
+        def send(index):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(socket_path)
+                client.sendall((json.dumps(requests[index]) + "\n").encode('utf-8'))
+                responses[index] = json.loads(client.makefile('r', encoding='utf-8').readline())
+
+        threads = [threading.Thread(target=send, args=(index,)) for index in range(len(requests))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+        return responses
+
+    def test_connections_run_in_parallel(self):
+        socket_path = self.start_server(workers=3)
+        started = time.monotonic()
+        responses = self.request_all(socket_path, [{'id': i, 'path': self.pdf} for i in range(3)])
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(sorted(response['id'] for response in responses), [0, 1, 2])
+        self.assertTrue(all('result' in response for response in responses))
+        # Em série levaria 3 extrações
+        self.assertLess(elapsed, EXTRACTION_SECONDS * 2.5)
+
+    def test_queue_time_comes_out_of_deadline(self):
+        socket_path = self.start_server(workers=1)
+        responses = self.request_all(socket_path, [{'id': i, 'path': self.pdf, 'deadline': 10} for i in range(2)])
+        deadlines = sorted(response['result']['deadline'] for response in responses)
+
+        # O segundo pedido esperou uma extração inteira na fila
+        self.assertGreater(deadlines[0], 10 - EXTRACTION_SECONDS * 2)
+        self.assertLess(deadlines[0], 10 - EXTRACTION_SECONDS * 0.8)
+        self.assertGreater(deadlines[1], 10 - EXTRACTION_SECONDS * 0.8)
+
+    def test_deadline_spent_in_queue_answers_busy(self):
+        socket_path = self.start_server(workers=1)
+        responses = self.request_all(socket_path, [{'id': i, 'path': self.pdf, 'deadline': 0.2} for i in range(2)])
+        busy = [response for response in responses if response.get('busy')]
+
+        self.assertEqual(len(busy), 1)
+        self.assertIn('error', busy[0])
+
+    def test_ping(self):
+        socket_path = self.start_server(workers=1)
+        self.assertEqual(self.request_all(socket_path, [{'id': 1, 'command': 'ping'}])[0]['result'], 'pong')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Testes do motor de padrões: o filtro por literal não muda o resultado
+
+Uso (no diretório scripts):
+    python -m unittest discover -s tests
+"""
+
+import os
+import random
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contract_extractor import fields, full_fields  # noqa: E402
+from contract_extractor.field_engine import literal_prefix, prepare, search_first  # noqa: E402
+
+
+TRECHOS = [
+    "CONTRATO Nº 123/2024",
+    "Termo de Contrato nº 45/2023",
+    "OBJETO: prestação de serviços de limpeza e conservação predial",
+    "CONTRATANTE: Companhia de Desenvolvimento de Maricá - CODEMAR",
+    "CONTRATADA: DESTAQ COMÉRCIO E SERVIÇOS LTDA",
+    "VALOR TOTAL R$ 1.234,56",
+    "valor do contrato é de R$ 10.000,00",
+    "R$ 99,00",
+    "DATA DO INÍCIO: 16/10/2024",
+    "vigência até 15/10/2025",
+    "Data de Término: 31/12/2025",
+    "Maricá, 15 de outubro de 2024.",
+    "Lei nº 13.303, de 30 de junho de 2016",
+    "Secretaria de Obras",
+    "Fonte de Recurso: Recursos Próprios",
+    # Minúsculas com tamanho diferente e caracteres que o re trata diferente de lower()
+    "İSTANBUL",
+    "5 Kelvin",
+    "\n",
+]
+
+
+def pattern_lists():
+    """Listas de padrões (nome, padrões) dos dois conjuntos de campos"""
+    for module in (fields, full_fields):
+        for name, value in vars(module).items():
+            if name.endswith('_PATTERNS') or name.endswith('_PATTERNS_AMPLOS'):
+                yield f'{module.__name__}.{name}', value
+
+
+def search_plain(text, patterns):
+    """Busca de referência: re.search padrão a padrão, sem filtro"""
+    for pattern in patterns:
+        match = re.search(pattern.regex.pattern, text, pattern.regex.flags)
+        if match:
+            return match
+    return None
+
+
+class SearchFirstTest(unittest.TestCase):
+
+    def assertSameMatch(self, text, name, patterns):
+        expected = search_plain(text, patterns)
+        match = search_first(prepare(text), patterns)
+        with self.subTest(pattern=name, text=text[:80]):
+            if expected is None:
+                self.assertIsNone(match)
+            else:
+                self.assertIsNotNone(match)
+                self.assertEqual((match.span(), match.groups()), (expected.span(), expected.groups()))
+
+    def test_priority_wins_over_position(self):
+        # "R$" aparece antes, mas "valor total" tem prioridade
+        text = "Pagamento de R$ 10,00 na entrega. VALOR TOTAL R$ 1.234,56"
+        match = search_first(prepare(text), fields.VALOR_PATTERNS_AMPLOS)
+        self.assertEqual(match.group(1), '1.234,56')
+
+    def test_matches_plain_search(self):
+        rng = random.Random(5)
+        texts = [' '.join(rng.choice(TRECHOS) for _ in range(rng.randint(1, 40))) for _ in range(200)]
+        for text in texts:
+            for name, patterns in pattern_lists():
+                self.assertSameMatch(text, name, patterns)
+
+    def test_literal_prefix(self):
+        self.assertEqual(literal_prefix(r'valor\s*total'), 'valor')
+        self.assertEqual(literal_prefix(r'r\$\s*([\d\.,]+)'), 'r$')
+        # Caractere opcional ou alternância no nível de cima: sem literal seguro
+        self.assertEqual(literal_prefix(r'contratad[ao]?'), 'contratad')
+        self.assertEqual(literal_prefix(r'lei?'), 'le')
+        self.assertIsNone(literal_prefix(r'valor|preço'))
+        self.assertIsNone(literal_prefix(r'(?<![\d])\d+'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Testes dos conjuntos de campos sobre trechos de contratos
+
+Uso (no diretório scripts):
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contract_extractor.fields import BASIC_FIELDS  # noqa: E402
+from contract_extractor.full_fields import FULL_FIELDS  # noqa: E402
+
+
+ASSINATURA = (
+    "DATA DO INÍCIO: 16/10/2024\n"
+    "DATA DE TÉRMINO: 15/10/2025\n\n"
+    "Maricá, 15 de outubro de 2024.\n"
+)
+
+LEI = "Contrato regido pela Lei nº 13.303, de 30 de junho de 2016, e demais normas.\n"
+
+LEI_SEM_VIRGULA = "Aplica-se subsidiariamente a Lei nº 8.666 de 21 de junho de 1993.\n"
+
+# Assinatura sem o "Maricá,", lida pelo padrão genérico de data por extenso
+ASSINATURA_SEM_LOCAL = "Rio de Janeiro, 15 de outubro de 2024.\n"
+
+
+class SignatureDateTest(unittest.TestCase):
+
+    def test_full_fields_read_signature_date(self):
+        self.assertEqual(FULL_FIELDS.extract(ASSINATURA)['data_final_documento'], '2024-10-15')
+        self.assertNotIn('data_final_documento', FULL_FIELDS.missing(ASSINATURA, FULL_FIELDS.priority))
+
+    def test_basic_fields_read_signature_date(self):
+        self.assertEqual(BASIC_FIELDS.extract(ASSINATURA)['data_final_documento'], '2024-10-15')
+        self.assertNotIn('data_final_documento', BASIC_FIELDS.missing(ASSINATURA, BASIC_FIELDS.priority))
+
+    def test_signature_date_ignores_law_date(self):
+        self.assertIsNone(FULL_FIELDS.extract(LEI)['data_final_documento'])
+        self.assertIsNone(FULL_FIELDS.extract(LEI_SEM_VIRGULA)['data_final_documento'])
+        self.assertEqual(FULL_FIELDS.extract(LEI + ASSINATURA)['data_final_documento'], '2024-10-15')
+
+    def test_written_date_without_place(self):
+        self.assertEqual(FULL_FIELDS.extract(ASSINATURA_SEM_LOCAL)['data_final_documento'], '2024-10-15')
+        # A data da lei vem antes no texto, mas só a da assinatura conta
+        text = LEI + LEI_SEM_VIRGULA + ASSINATURA_SEM_LOCAL
+        self.assertEqual(FULL_FIELDS.extract(text)['data_final_documento'], '2024-10-15')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Testes do alcance das regiões dos modelos de contrato
+
+Uso (no diretório scripts):
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contract_extractor.layouts import CODEMAR_LAYOUT, reachable_fields  # noqa: E402
+
+
+class ReachableFieldsTest(unittest.TestCase):
+
+    def test_every_region_reachable(self):
+        fields = reachable_fields(8, lambda page_num: True, [CODEMAR_LAYOUT])
+        self.assertIn('numero_contrato', fields)
+        self.assertIn('data_final_documento', fields)
+
+    def test_last_page_outside_budget(self):
+        # Preset que só lê as 3 primeiras páginas não alcança a assinatura na última
+        fields = reachable_fields(8, lambda page_num: page_num < 3, [CODEMAR_LAYOUT])
+        self.assertIn('valor', fields)
+        self.assertNotIn('data_final_documento', fields)
+
+    def test_single_page_reaches_signature(self):
+        fields = reachable_fields(1, lambda page_num: page_num < 3, [CODEMAR_LAYOUT])
+        self.assertIn('data_final_documento', fields)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Testes da entrega do pixmap ao OCR
+
+Uso (no diretório scripts):
+    python -m unittest discover -s tests
+"""
+
+import gc
+import os
+import sys
+import unittest
+
+import fitz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contract_extractor.ocr_engine import pixmap_to_image, render_gray  # noqa: E402
+
+
+class PixmapToImageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.doc = fitz.open()
+        page = self.doc.new_page(width=200, height=100)
+        page.insert_text((20, 50), "CONTRATO")
+        self.pix = render_gray(page, 1)
+
+    def tearDown(self):
+        self.doc.close()
+
+    def test_image_shares_pixmap_buffer(self):
+        image = pixmap_to_image(self.pix)
+        self.assertEqual(image.size, (self.pix.width, self.pix.height))
+        self.assertEqual(image.getpixel((0, 0)), 255)
+
+        # Sem cópia: alterar o pixmap altera a imagem
+        self.pix.set_pixel(0, 0, (7,))
+        self.assertEqual(image.getpixel((0, 0)), 7)
+
+    def test_image_keeps_pixmap_alive(self):
+        expected = self.pix.samples
+        image = pixmap_to_image(self.pix)
+        del self.pix
+        gc.collect()
+        self.assertEqual(image.tobytes(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
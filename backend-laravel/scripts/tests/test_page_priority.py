@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Testes da ordem de OCR por prioridade
+
+Uso (no diretório scripts):
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contract_extractor import page_priority  # noqa: E402
+from contract_extractor.document import DocumentSession  # noqa: E402
+from contract_extractor.page_priority import CANDIDATE_PAGES, iter_prioritized_pages  # noqa: E402
+from fixtures import make_scanned_contract  # noqa: E402
+
+
+class PrioritizedPagesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.page_count = CANDIDATE_PAGES + 5
+        # Valor na página 10, assinatura na última
+        pages = {10: "VALOR DO CONTRATO: R$ 1.000,00\n", cls.page_count - 1: "Maricá, 15 de outubro de 2024.\n"}
+        cls.path, cls.texts = make_scanned_contract(cls.tmp.name, cls.page_count, blank=(3,), pages=pages)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def run_pages(self, missing_fields, budget=None):
+        with DocumentSession(self.path) as session, \
+                mock.patch.object(page_priority, 'thumbnail_text', lambda page, lang: self.texts[page.number]):
+            return [
+                (page_num, kind)
+                for page_num, _, kind in iter_prioritized_pages(
+                    session, lambda n: self.texts[n], missing_fields, budget=budget,
+                )
+            ]
+
+    def test_every_scanned_page_is_ocr_without_budget(self):
+        pages = self.run_pages(lambda texts: ['numero_contrato'])
+        ocr = [page_num for page_num, kind in pages if kind == 'ocr']
+        # Todas as páginas menos a em branco, as de fora das candidatas por último e em ordem
+        self.assertEqual(sorted(ocr), [n for n in range(self.page_count) if n != 3])
+        rest = list(range(CANDIDATE_PAGES - 1, self.page_count - 1))
+        self.assertEqual(ocr[-len(rest):], rest)
+
+    def test_keywords_come_first(self):
+        pages = self.run_pages(lambda texts: [] if 'R$' in ''.join(texts) else ['valor'], budget=3)
+        self.assertEqual(pages, [(10, 'ocr')])
+
+    def test_budget_limits_ocr(self):
+        pages = self.run_pages(lambda texts: ['numero_contrato'], budget=4)
+        self.assertEqual(len(pages), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
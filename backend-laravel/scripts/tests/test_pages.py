@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Testes da leitura das páginas sobre contratos escaneados, com o OCR simulado
+
+Uso (no diretório scripts):
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import multiprocessing
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contract_extractor import deadline, layouts, pages  # noqa: E402
+from contract_extractor.deadline import Deadline  # noqa: E402
+from contract_extractor.document import DocumentSession  # noqa: E402
+from contract_extractor.presets import get_preset  # noqa: E402
+from fixtures import fake_ocr_page, make_scanned_contract  # noqa: E402
+
+
+CABECALHO = "CONTRATO Nº 001/2024\nCONTRATADA: EMPRESA LTDA - CNPJ 12.345.678/0001-90\n"
+VALOR = "VALOR DO CONTRATO: R$ 1.000,00\n"
+PRAZOS = "DATA DO INÍCIO: 16/10/2024\nMaricá, 15 de outubro de 2024.\n"
+
+
+class PagesTestCase(unittest.TestCase):
+    """Contrato escaneado em um diretório temporário, com OCR e cache simulados"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.patch(pages, 'open_page_cache', lambda session, settings: None)
+
+    def patch(self, target, name, value):
+        patcher = mock.patch.object(target, name, value)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def scanned(self, page_count, delay=0.0, **options):
+        path, self.texts = make_scanned_contract(self.tmp.name, page_count, **options)
+        self.patch(pages, 'ocr_page', fake_ocr_page(self.texts, delay))
+        session = DocumentSession(path)
+        self.addCleanup(session.close)
+        return session
+
+
+class RegionPagesTest(PagesTestCase):
+
+    def read(self, session, region_texts):
+        self.patch(layouts, 'ocr_region', lambda page, region, zoom, lang=None, config='': region_texts[region.name])
+        return list(pages._iter_pages_regions(session, get_preset('minimal'), None, None))
+
+    def test_regions_of_a_page_come_out_once(self):
+        session = self.scanned(2)
+        read = self.read(session, {'cabecalho': CABECALHO, 'valor': VALOR, 'assinatura': PRAZOS})
+
+        self.assertEqual([page_num for page_num, _, _ in read], [0, 1])
+        self.assertEqual(read[0][1], CABECALHO + '\n' + VALOR)
+        self.assertEqual(read[1][1], PRAZOS)
+
+    def test_full_page_replaces_region_text(self):
+        # As regiões não acham nada; a página inteira tem todos os campos
+        session = self.scanned(2, pages={0: CABECALHO + VALOR + PRAZOS})
+        read = self.read(session, {'cabecalho': 'cabecalho', 'valor': 'valor', 'assinatura': 'assinatura'})
+
+        self.assertEqual(read, [(0, self.texts[0], 'OCR'), (1, 'assinatura', 'OCR')])
+
+
+class OcrOrderTest(PagesTestCase):
+    """Páginas 1 e 5 em branco; a 2 só tem a linha da assinatura (pouca tinta)"""
+
+    def order(self, budget=None):
+        session = self.scanned(8, blank=(1, 5), pages={2: "Maricá, 15 de outubro de 2024.\n"}, name=f'ordem_{budget}')
+        order = pages.OcrOrder(session, range(session.page_count), budget)
+        return list(order), session.blank_pages
+
+    def test_blank_skipped_and_low_ink_last(self):
+        self.assertEqual(self.order(), ([0, 3, 4, 6, 7, 2], [1, 5]))
+
+    def test_low_ink_only_with_budget_left(self):
+        self.assertEqual(self.order(budget=5)[0], [0, 3, 4, 6, 7])
+        self.assertEqual(self.order(budget=6)[0], [0, 3, 4, 6, 7, 2])
+
+    def test_classification_stops_with_budget(self):
+        # Com o orçamento completo na página 4, a 5 nem é examinada
+        self.assertEqual(self.order(budget=3), ([0, 3, 4], [1]))
+
+
+# Segundos de OCR simulado por página
+PAGE_SECONDS = 0.5
+
+
+@unittest.skipUnless(multiprocessing.get_start_method() == 'fork', 'o processo de trabalho precisa herdar o mock')
+class DeadlineTest(PagesTestCase):
+    """Preset 'simple' (5 páginas de OCR) com 2 processos de OCR e o prazo em escala de meio segundo"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch(pages, 'OCR_WORKERS', 2)
+        self.patch(deadline, 'DEFAULT_PAGE_ESTIMATE', PAGE_SECONDS)
+        self.patch(deadline, 'FIELDS_RESERVE', PAGE_SECONDS)
+
+    def read(self, seconds):
+        session = self.scanned(8, delay=PAGE_SECONDS)
+        limit = Deadline(seconds)
+        read = list(pages.iter_pages(session, get_preset('simple'), None, limit))
+        return [page_num for page_num, _, _ in read], limit
+
+    def test_full_budget_close_to_deadline_is_not_partial(self):
+        # As 5 páginas terminam em ~1.5 s; ao fim sobram ~0.9 s, menos que uma página e a reserva
+        read, limit = self.read(4.8 * PAGE_SECONDS)
+        self.assertEqual(read, [0, 1, 2, 3, 4])
+        self.assertFalse(limit.stopped)
+        self.assertNotIn('partial', limit.mark({}))
+
+    def test_deadline_cuts_the_budget(self):
+        # Três páginas partem no início; depois da primeira rodada não cabe outra antes do prazo
+        read, limit = self.read(2.5 * PAGE_SECONDS)
+        self.assertTrue(limit.stopped)
+        self.assertEqual(read, [0, 1])
+        self.assertEqual(limit.mark({})['pages_covered'], read)
+
+
+if __name__ == '__main__':
+    unittest.main()
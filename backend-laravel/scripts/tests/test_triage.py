@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Testes da triagem sobre contratos do corpus sintético
+
+Uso (no diretório scripts):
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contract_extractor.triage import ESCANEADO, FILA_OCR, FILA_RAPIDA, TEXTO, triage_document  # noqa: E402
+from synthetic_corpus import generate_corpus  # noqa: E402
+
+
+class TriageTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        generate_corpus(cls.tmp.name, page_counts=(1, 8))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_scan_goes_to_ocr_lane_with_default_preset(self):
+        triage = triage_document(self.path('contrato_08p_escaneado.pdf'), 'minimal')
+        self.assertEqual(triage['tipo'], ESCANEADO)
+        self.assertEqual(triage['paginas_ocr_estimadas'], 3)
+        self.assertEqual(triage['fila'], FILA_OCR)
+
+    def test_single_page_scan_goes_to_ocr_lane(self):
+        triage = triage_document(self.path('contrato_01p_escaneado.pdf'), 'minimal')
+        self.assertEqual(triage['fila'], FILA_OCR)
+
+    def test_text_pdf_goes_to_fast_lane(self):
+        triage = triage_document(self.path('contrato_08p_texto.pdf'), 'minimal')
+        self.assertEqual(triage['tipo'], TEXTO)
+        self.assertEqual(triage['custo_ocr_estimado'], 0.0)
+        self.assertEqual(triage['fila'], FILA_RAPIDA)
+
+
+if __name__ == "__main__":
+    unittest.main()